@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.contrib.admin import widgets
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Event, Registration, Certificate
+from django.utils import timezone
+from .models import User, Event, Registration, Certificate, EmailOutbox
 
 # ---------------- Admin do usuário ----------------
 @admin.register(User)
@@ -16,7 +18,15 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'event_type', 'start_date', 'end_date', 'location', 'max_participants')
     list_filter = ('event_type', 'start_date')
     search_fields = ('title', 'location')
-    filter_horizontal = ('participants',)  
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        # Registration é o through de participants; o admin esconde campos com
+        # through explícito, mas como os demais campos de Registration são
+        # automáticos o set() do formulário continua funcionando.
+        if db_field.name == 'participants':
+            kwargs.setdefault('widget', widgets.FilteredSelectMultiple(db_field.verbose_name, False))
+            return db_field.formfield(**kwargs)
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
 
 # ---------------- Admin da inscrição ----------------
 @admin.register(Registration)
@@ -24,8 +34,41 @@ class RegistrationAdmin(admin.ModelAdmin):
     list_display = ('user', 'event', 'registered_at')
     list_filter = ('event',)
 
+    # Inscrições entram pela vaga do evento (site, API ou campo participants
+    # do EventAdmin), que mantém participants_count e a auditoria.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def delete_model(self, request, obj):
+        obj.event.participants.remove(obj.user)
+
+    def delete_queryset(self, request, queryset):
+        por_evento = {}
+        for registration in queryset.select_related('event'):
+            por_evento.setdefault(registration.event, []).append(registration.user_id)
+        for event, user_ids in por_evento.items():
+            event.participants.remove(*user_ids)
+
 # ---------------- Admin do certificado ----------------
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ('user', 'event', 'date_issued')
     list_filter = ('event',)
+
+# ---------------- Admin da fila de e-mails ----------------
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['reenviar']
+
+    @admin.action(description="Reenviar mensagens selecionadas")
+    def reenviar(self, request, queryset):
+        queryset.exclude(status=EmailOutbox.SENT).update(
+            status=EmailOutbox.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
@@ -0,0 +1,232 @@
+"""
+Retenção e arquivamento dos logs de auditoria.
+
+Entradas mais antigas que AUDIT_LOG_RETENTION_DAYS saem do banco para
+partições diárias em JSON Lines comprimido
+(AUDIT_ARCHIVE_DIR/<ano>/<dia>.jsonl.gz). Cada dia é lido com .iterator(),
+gravado no disco e só então apagado, em lotes pequenos, para que a trava de
+escrita do SQLite nunca fique presa por muito tempo. O indice.json guarda o
+intervalo de ids de cada partição: a busca do visualizador de logs só abre
+as partições que podem ter a página pedida.
+"""
+import gzip
+import json
+import os
+import shutil
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from .models import AuditLog
+
+TAMANHO_LOTE = 500
+CAMPOS = ('id', 'timestamp', 'user_id', 'action', 'model', 'object_id', 'description', 'changes')
+
+
+# ---------------- Partições ----------------
+
+def _pasta():
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def caminho_particao(dia):
+    return _pasta() / f'{dia:%Y}' / f'{dia.isoformat()}.jsonl.gz'
+
+
+def carregar_indice():
+    """{'AAAA-MM-DD': {'primeiro', 'ultimo', 'linhas'}} das partições gravadas."""
+    try:
+        with open(_pasta() / 'indice.json', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _salvar_indice(indice):
+    _pasta().mkdir(parents=True, exist_ok=True)
+    temporario = _pasta() / 'indice.json.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, indent=1, sort_keys=True)
+    os.replace(temporario, _pasta() / 'indice.json')
+
+
+def _ler_particao(dia):
+    with gzip.open(caminho_particao(dia), 'rt', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            yield json.loads(linha)
+
+
+def _inicio(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+# ---------------- Arquivamento ----------------
+
+def data_limite(dias=None):
+    """Primeiro dia que fica no banco; as entradas de antes dele são arquivadas."""
+    dias = settings.AUDIT_LOG_RETENTION_DAYS if dias is None else dias
+    return timezone.localdate() - timedelta(days=dias)
+
+
+def arquivar_logs(limite, apagar=True, lote=TAMANHO_LOTE):
+    """
+    Move para o arquivo as entradas anteriores ao dia `limite`, um dia de
+    cada vez. Com apagar=False só conta o que seria arquivado. Retorna
+    {dia: quantidade}.
+    """
+    pendentes = AuditLog.objects.filter(timestamp__lt=_inicio(limite)).order_by('timestamp', 'id')
+    resultado = {}
+    proximo = pendentes.values_list('timestamp', flat=True).first()
+    while proximo is not None:
+        dia = timezone.localtime(proximo).date()
+        fim = _inicio(dia + timedelta(days=1))
+        do_dia = pendentes.filter(timestamp__gte=_inicio(dia), timestamp__lt=fim)
+        resultado[dia] = _arquivar_dia(dia, do_dia, lote) if apagar else do_dia.count()
+        proximo = pendentes.filter(timestamp__gte=fim).values_list('timestamp', flat=True).first()
+    return resultado
+
+
+def _arquivar_dia(dia, entradas, lote):
+    caminho = caminho_particao(dia)
+    # Execução interrompida entre a gravação e o DELETE: o que a partição já
+    # tem não é gravado de novo. Vale a partição, não o índice, que pode ter
+    # ficado para trás se a interrupção veio logo depois do os.replace
+    ja_gravados = {registro['id'] for registro in _ler_particao(dia)} if caminho.exists() else set()
+
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    ids, novos = [], []
+    with open(temporario, 'wb') as bruto:
+        if caminho.exists():
+            # Membros gzip concatenados são lidos como um único arquivo
+            with open(caminho, 'rb') as existente:
+                shutil.copyfileobj(existente, bruto)
+        with gzip.GzipFile(fileobj=bruto, mode='wb') as arquivo:
+            for valores in entradas.values_list(*CAMPOS).iterator(chunk_size=2000):
+                registro = dict(zip(CAMPOS, valores))
+                ids.append(registro['id'])
+                if registro['id'] in ja_gravados:
+                    continue
+                registro['timestamp'] = registro['timestamp'].isoformat()
+                arquivo.write(json.dumps(registro, ensure_ascii=False).encode('utf-8') + b'\n')
+                novos.append(registro['id'])
+        bruto.flush()
+        os.fsync(bruto.fileno())
+    os.replace(temporario, caminho)
+
+    # A entrada do índice sai inteira da partição gravada
+    todos = ja_gravados.union(novos)
+    if todos:
+        indice = carregar_indice()
+        entrada = {'primeiro': min(todos), 'ultimo': max(todos), 'linhas': len(todos)}
+        if indice.get(dia.isoformat()) != entrada:
+            indice[dia.isoformat()] = entrada
+            _salvar_indice(indice)
+
+    # Um DELETE curto por lote, cada um na sua transação
+    for inicio in range(0, len(ids), lote):
+        AuditLog.objects.filter(pk__in=ids[inicio:inicio + lote]).delete()
+    return len(ids)
+
+
+# ---------------- Busca ----------------
+
+def _entrada(registro):
+    return AuditLog(**{**registro, 'timestamp': datetime.fromisoformat(registro['timestamp'])})
+
+
+def _instancias(registros):
+    entradas = [_entrada(registro) for registro in registros]
+    prefetch_related_objects(entradas, 'user')
+    return entradas
+
+
+def _coletar(dias, aceita, limite, recentes_primeiro):
+    pagina = []
+    for dia in dias:
+        registros = filter(aceita, _ler_particao(date.fromisoformat(dia)))
+        registros = sorted(registros, key=itemgetter('id'), reverse=recentes_primeiro)
+        pagina.extend(registros[:limite - len(pagina)])
+        if len(pagina) == limite:
+            break
+    return pagina
+
+
+def buscar_arquivados(filtros, antes=None, depois=None, tamanho=20):
+    """
+    Página das entradas arquivadas, com os filtros de AuditLogFilterForm
+    (`filtros` é o cleaned_data) e o mesmo cursor ?before=/?after= do
+    visualizador; no arquivo a ordem é a do id. Retorna (entradas,
+    há_mais_novas, há_mais_antigas), com instâncias de AuditLog não salvas.
+    """
+    indice = carregar_indice()
+    dias = sorted(indice)
+    if filtros.get('date_from'):
+        dias = [dia for dia in dias if dia >= filtros['date_from'].isoformat()]
+    if filtros.get('date_to'):
+        dias = [dia for dia in dias if dia <= filtros['date_to'].isoformat()]
+
+    def confere(registro):
+        return (
+            (not filtros.get('model') or registro['model'] == filtros['model'])
+            and (not filtros.get('action') or registro['action'] == filtros['action'])
+            and (not filtros.get('user') or registro['user_id'] == filtros['user'])
+        )
+
+    if depois is not None:
+        dias = [dia for dia in dias if indice[dia]['ultimo'] > depois]
+        pagina = _coletar(dias, lambda r: r['id'] > depois and confere(r), tamanho + 1, recentes_primeiro=False)
+        return _instancias(pagina[:tamanho][::-1]), len(pagina) > tamanho, True
+
+    if antes is not None:
+        dias = [dia for dia in dias if indice[dia]['primeiro'] < antes]
+    pagina = _coletar(
+        reversed(dias), lambda r: (antes is None or r['id'] < antes) and confere(r),
+        tamanho + 1, recentes_primeiro=True,
+    )
+    return _instancias(pagina[:tamanho]), antes is not None, len(pagina) > tamanho
+
+
+# ---------------- Restauração ----------------
+
+def restaurar_particao(dia, lote=TAMANHO_LOTE):
+    """
+    Devolve ao banco as entradas da partição de `dia`, com os ids e horários
+    originais, e apaga a partição. Entradas que já estão no banco são
+    ignoradas. Retorna quantas foram lidas.
+    """
+    total = 0
+    registros = _ler_particao(dia)
+    while pedaco := list(islice(registros, lote)):
+        gravar_entradas([_entrada(registro) for registro in pedaco])
+        total += len(pedaco)
+
+    caminho_particao(dia).unlink()
+    indice = carregar_indice()
+    indice.pop(dia.isoformat(), None)
+    _salvar_indice(indice)
+    return total
+
+
+def gravar_entradas(entradas):
+    """
+    Grava instâncias de AuditLog não salvas mantendo o id e o horário de
+    cada uma. Ids que já estão no banco são ignorados.
+    """
+    with transaction.atomic(using=router.db_for_write(AuditLog)):
+        existentes = set(AuditLog.objects.filter(pk__in=[e.pk for e in entradas]).values_list('pk', flat=True))
+        novas = [entrada for entrada in entradas if entrada.pk not in existentes]
+        if not novas:
+            return
+        horarios = [entrada.timestamp for entrada in novas]
+        AuditLog.objects.bulk_create(novas)
+        # O bulk_create aplica o auto_now_add; o horário original volta aqui
+        for entrada, horario in zip(novas, horarios):
+            entrada.timestamp = horario
+        AuditLog.objects.bulk_update(novas, ['timestamp'])
@@ -0,0 +1,314 @@
+"""
+Medição de queries, latência e tamanho de resposta de todas as rotas de
+core/urls.py. Usado pelo comando `benchmark`; roda num banco de teste
+descartável, nunca no db.sqlite3.
+"""
+import json
+import re
+import statistics
+import tempfile
+from datetime import date, timedelta
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.db.models import F
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import seeding, urls as core_urls
+from .forms import AuditLogFilterForm, EventFilterForm
+from .pagination import EventKeysetPagination
+from .models import AuditLog, Event
+from .registrations import cancelar_inscricao, reservar_vaga
+
+User = get_user_model()
+
+# Como exercitar cada rota. Rotas ausentes aqui são chamadas com GET, logadas
+# como organizador; se exigirem argumentos desconhecidos, são puladas.
+#   method: verbo HTTP; auth: 'session', 'jwt' ou None; as_user: quem faz a
+#   requisição; kwargs/data/query: funções que recebem o dataset semeado
+#   (query vira a query string dos GETs); multipart: envia `data` como
+#   formulário (upload) em vez de JSON; preparar: função que recebe o
+#   dataset e é chamada antes de cada repetição, fora da medição, para que
+#   todas percorram o mesmo caminho (ex.: a inscrição desfeita antes de
+#   inscrever de novo).
+ROTAS = {
+    'home': {'auth': None},
+    'events': {'auth': None},
+    'event_detail': {'kwargs': lambda d: {'event_id': d['event'].id}},
+    'event_form': {},
+    'edit_event': {'kwargs': lambda d: {'event_id': d['event'].id}},
+    'event_delete': {'kwargs': lambda d: {'event_id': d['event'].id}},
+    'profile': {'as_user': 'participant'},
+    'edit_profile': {'as_user': 'participant'},
+    'signup': {'auth': None},
+    'login': {'auth': None},
+    'logout': {'as_user': 'participant'},
+    'token_obtain_pair': {
+        'method': 'post', 'auth': None,
+        'data': lambda d: {'username': d['participant'].username, 'password': seeding.SENHA},
+    },
+    'token_refresh': {
+        'method': 'post', 'auth': None,
+        'data': lambda d: {'refresh': str(RefreshToken.for_user(d['participant']))},
+    },
+    'api_events_list': {'auth': 'jwt', 'as_user': 'participant'},
+    'api_events_search': {
+        'auth': 'jwt', 'as_user': 'participant',
+        'query': lambda d: {'q': d['event'].title.split()[0][:5]},
+    },
+    'api_event_create': {
+        'method': 'post', 'auth': 'jwt',
+        'data': lambda d: {
+            'title': 'Evento de benchmark', 'description': 'Criado pelo benchmark',
+            'event_type': 'lecture', 'start_date': '2030-01-01', 'end_date': '2030-01-01',
+            'start_time': '10:00', 'end_time': '11:00', 'location': 'Auditório',
+            'max_participants': 10,
+        },
+    },
+    'api_event_register': {
+        'method': 'post', 'auth': 'jwt', 'as_user': 'outsider',
+        'kwargs': lambda d: {'event_id': d['event'].id},
+        'preparar': lambda d: cancelar_inscricao(d['event'], d['outsider']),
+    },
+    'api_event_cancel': {
+        'method': 'delete', 'auth': 'jwt', 'as_user': 'outsider',
+        'kwargs': lambda d: {'event_id': d['event'].id},
+        'preparar': lambda d: reservar_vaga(d['event'], d['outsider']),
+    },
+    'api_event_import': {
+        'method': 'post', 'auth': 'jwt', 'multipart': True,
+        'kwargs': lambda d: {'event_id': d['event'].id},
+        'data': lambda d: {'file': SimpleUploadedFile(
+            'participantes.csv',
+            ('username\n' + ''.join(f'{user.username}\n' for user in d['importados'])).encode(),
+            content_type='text/csv',
+        )},
+        'preparar': lambda d: d['event'].participants.remove(*d['importados']),
+    },
+    'api_my_events': {'auth': 'jwt', 'as_user': 'participant'},
+    'preview_email': {'as_user': 'participant'},
+    'audit_logs': {},
+    'activate_user': {
+        'auth': None,
+        'kwargs': lambda d: {'uidb64': urlsafe_base64_encode(force_bytes(d['participant'].pk))},
+    },
+    'emitir_certificado': {
+        'kwargs': lambda d: {'event_id': d['event'].id, 'user_id': d['participant'].id},
+    },
+    'emitir_certificados_evento': {'kwargs': lambda d: {'event_id': d['event'].id}},
+    'exportar_participantes_evento': {
+        'kwargs': lambda d: {'event_id': d['event'].id},
+        'query': lambda d: {'formato': 'xlsx'},
+    },
+    'exportar_inscricoes': {},
+}
+
+
+# Filtros da listagem de eventos (core.forms.EventFilterForm) cujo plano no
+# SQLite não pode ler a tabela inteira nem ordenar em memória.
+FILTROS_INDEXADOS = {
+    'upcoming': lambda d: {},
+    'event_type': lambda d: {'event_type': d['event'].event_type},
+    'organizer': lambda d: {'organizer': d['organizer'].id},
+    'date_range': lambda d: {'date_from': d['event'].start_date, 'date_to': d['event'].start_date + timedelta(days=30)},
+    'type_and_organizer': lambda d: {'event_type': d['event'].event_type, 'organizer': d['organizer'].id},
+    'has_seats': lambda d: {'has_seats': 'on'},
+    'past_by_type': lambda d: {'past': 'on', 'event_type': d['event'].event_type},
+}
+# O mesmo para o visualizador de logs (core.forms.AuditLogFilterForm), na
+# primeira página e numa página seguinte (?before=)
+FILTROS_LOG = {
+    'logs': lambda d: {},
+    'logs_model': lambda d: {'model': 'Event'},
+    'logs_action': lambda d: {'action': 'CREATE'},
+    'logs_user': lambda d: {'user': d['participant'].username},
+    'logs_date_range': lambda d: {'date_from': date.today() - timedelta(days=7), 'date_to': date.today()},
+}
+_PLANO_RUIM = re.compile(r'SCAN core_\w+\b(?! USING)|USE TEMP B-TREE')
+# Métrica do resultado -> chave do limite no arquivo de orçamento
+METRICAS = {'queries': 'max_queries', 'p95_ms': 'max_p95_ms', 'bytes': 'max_bytes'}
+# Usuários do CSV importado por api_event_import
+IMPORTADOS = 10
+
+
+def semear(users=200, events=50, registrations_per_event=40, seed=42):
+    """Gera o dataset com core.seeding e escolhe os usuários de cada papel."""
+    seeding.gerar_dataset(users, events, registrations_per_event, seed=seed)
+    # Com vagas para o outsider e os importados, senão inscrição e importação
+    # mediriam o caminho de "lotado"
+    eventos = Event.objects.order_by('id')
+    event = (
+        eventos.filter(participants_count__gt=0, participants_count__lte=F('max_participants') - IMPORTADOS - 1).first()
+        or eventos.filter(participants_count__gt=0).first()
+        or eventos.first()
+    )
+    outsider = User.objects.create(
+        username='bench_outsider', email='bench_outsider@sgea.com',
+        password=make_password(seeding.SENHA), role='student',
+    )
+    importados = list(
+        User.objects.exclude(pk__in=[event.organizer_id, outsider.pk])
+        .exclude(events_participated=event).order_by('id')[:IMPORTADOS]
+    )
+    return {
+        'organizer': event.organizer,
+        'participant': event.participants.order_by('id').first() or outsider,
+        'outsider': outsider,
+        'importados': importados,
+        'event': event,
+    }
+
+
+def _cliente(spec, dados):
+    client = Client()
+    user = dados[spec.get('as_user', 'organizer')]
+    auth = spec.get('auth', 'session')
+    headers = {}
+    if auth == 'session':
+        client.force_login(user)
+    elif auth == 'jwt':
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+    return client, headers
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def medir_rota(name, spec, dados, repeat):
+    url = reverse(f'core:{name}', kwargs=spec['kwargs'](dados) if 'kwargs' in spec else None)
+    method = spec.get('method', 'get')
+    latencias, queries, tamanho, status = [], [], 0, None
+
+    for _ in range(repeat):
+        if 'preparar' in spec:
+            spec['preparar'](dados)
+        client, headers = _cliente(spec, dados)
+        data = spec['data'](dados) if 'data' in spec else None
+        # Conta as queries de todos os bancos (o AuditLog pode estar no 'audit')
+        with ExitStack() as pilha:
+            capturas = [pilha.enter_context(CaptureQueriesContext(conexao)) for conexao in connections.all()]
+            inicio = time.perf_counter()
+            if method == 'get':
+                response = client.get(url, spec['query'](dados) if 'query' in spec else None, **headers)
+            elif spec.get('multipart'):
+                response = getattr(client, method)(url, data, **headers)
+            else:
+                response = getattr(client, method)(url, data, content_type='application/json', **headers)
+            if getattr(response, 'streaming', False):
+                tamanho = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                tamanho = len(response.content)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        queries.append(sum(len(captura.captured_queries) for captura in capturas))
+        # O pior status entre as repetições
+        status = max(status or 0, response.status_code)
+
+    return {
+        'url': url,
+        'method': method.upper(),
+        'status': status,
+        'queries': max(queries),
+        'p50_ms': round(statistics.median(latencias), 2),
+        'p95_ms': round(_percentil(latencias, 95), 2),
+        'bytes': tamanho,
+    }
+
+
+def rodar(dados, repeat=5, rotas=None):
+    """
+    Mede as rotas nomeadas de core/urls.py (todas, ou só as de `rotas`).
+    Retorna {nome: métricas}.
+    """
+    resultados = {}
+    # Os limites de throttle da API distorceriam a medição
+    sem_throttle = mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {
+        'events_list': None, 'events_register': None,
+    })
+    # Páginas e PDFs do banco de teste não devem ir para os caches reais
+    cache_isolado = override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+    })
+    with sem_throttle, cache_isolado, tempfile.TemporaryDirectory() as cache_dir, override_settings(CERTIFICATE_CACHE_DIR=cache_dir):
+        for pattern in core_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if rotas and pattern.name not in rotas:
+                continue
+            spec = ROTAS.get(pattern.name, {})
+            if pattern.pattern.converters and 'kwargs' not in spec:
+                resultados[pattern.name] = {'skipped': 'argumentos desconhecidos'}
+                continue
+            resultados[pattern.name] = medir_rota(pattern.name, spec, dados, repeat)
+    return resultados
+
+
+def verificar_planos(dados):
+    """
+    EXPLAIN QUERY PLAN de cada filtro de FILTROS_INDEXADOS e FILTROS_LOG. Retorna
+    ({nome: plano}, violações); fora do SQLite não verifica nada.
+    """
+    planos, violacoes = {}, []
+    if connection.vendor != 'sqlite':
+        return planos, violacoes
+    consultas = {}
+    for nome, params in FILTROS_INDEXADOS.items():
+        filtros = EventFilterForm(params(dados))
+        filtros.is_valid()
+        consultas[nome] = filtros.filtrar(Event.objects.order_by('start_date', 'id'))[:EventKeysetPagination.page_size + 1]
+    ultimo_log = AuditLog.objects.order_by('-timestamp', '-id').values_list('timestamp', 'id').first()
+    for nome, params in FILTROS_LOG.items():
+        filtros = AuditLogFilterForm(params(dados))
+        filtros.is_valid()
+        logs = filtros.filtrar(AuditLog.objects.all()).order_by('-timestamp', '-id')
+        consultas[nome] = logs[:21]
+        if ultimo_log:
+            timestamp, pk = ultimo_log
+            consultas[f'{nome}_before'] = logs.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, pk__gte=pk)[:21]
+
+    for nome, queryset in consultas.items():
+        plano = queryset.explain()
+        planos[nome] = plano
+        if _PLANO_RUIM.search(plano):
+            violacoes.append({'route': f'plan:{nome}', 'metric': 'query_plan', 'value': plano, 'limit': 'index'})
+    return planos, violacoes
+
+
+def verificar_orcamento(resultados, orcamento, metricas=tuple(METRICAS)):
+    """
+    Compara as métricas com o arquivo de orçamento. Retorna a lista de
+    violações; `default` vale para rotas sem entrada própria em `routes`.
+    `metricas` limita a verificação (ex.: sem 'p95_ms', que depende da
+    máquina).
+    """
+    violacoes = []
+    verificadas = [(metrica, METRICAS[metrica]) for metrica in metricas]
+    for name, medidas in resultados.items():
+        if 'skipped' in medidas:
+            continue
+        limites = {**orcamento.get('default', {}), **orcamento.get('routes', {}).get(name, {})}
+        for metrica, chave in verificadas:
+            if chave in limites and medidas[metrica] > limites[chave]:
+                violacoes.append({
+                    'route': name, 'metric': metrica,
+                    'value': medidas[metrica], 'limit': limites[chave],
+                })
+    return violacoes
+
+
+def carregar_orcamento(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
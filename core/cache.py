@@ -0,0 +1,151 @@
+"""
+Cache das páginas públicas de eventos (home e listagem) e dos cards de cada
+evento.
+
+Cada evento tem uma versão no cache, renovada pelos signals de Event (save,
+delete e inscrições via participants) e pelos UPDATEs diretos que não passam
+por eles (core/registrations.py, core/images.py, recount_participants). O
+card fica em cache sob (id, versão), então alterar um evento só invalida o
+card dele. As páginas inteiras, guardadas só para visitantes anônimos,
+dependem de uma versão única da listagem, renovada junto com qualquer
+evento; ao refazê-las, os demais cards vêm do cache.
+
+Versões novas são o relógio em nanossegundos, nunca reaproveitadas: se o
+backend descartar uma versão, a próxima não reencontra cards antigos.
+Funciona com LocMemCache (um processo) e FileBasedCache (vários processos
+na mesma máquina).
+"""
+import hashlib
+import time
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Event
+
+CARD = 'core/event_card.html'
+VERSAO_LISTAGEM = 'eventos:versao'
+TIPOS = ('pagina', 'card')
+
+
+def _chave_versao(event_id):
+    return f'evento:{event_id}:versao'
+
+
+def _nova_versao():
+    return time.time_ns()
+
+
+# ---------------- Invalidação ----------------
+
+def invalidar_eventos(ids):
+    """Renova a versão dos eventos `ids` e da listagem, depois do commit."""
+    ids = list(ids)
+
+    def renovar():
+        versao = _nova_versao()
+        cache.set_many({**{_chave_versao(pk): versao for pk in ids}, VERSAO_LISTAGEM: versao}, None)
+
+    # Antes do commit, outra requisição poderia guardar o estado antigo sob
+    # a versão nova
+    transaction.on_commit(renovar)
+
+
+def invalidar_evento(event_id):
+    invalidar_eventos([event_id])
+
+
+def _versoes(chaves):
+    versoes = cache.get_many(chaves)
+    faltando = {chave: _nova_versao() for chave in chaves if chave not in versoes}
+    if faltando:
+        cache.set_many(faltando, None)
+        versoes.update(faltando)
+    return versoes
+
+
+# ---------------- Contadores ----------------
+
+def _contar(tipo, acertos=0, falhas=0):
+    for nome, quantidade in (('hits', acertos), ('misses', falhas)):
+        if quantidade:
+            chave = f'estatisticas:{tipo}:{nome}'
+            if not cache.add(chave, quantidade, None):
+                cache.incr(chave, quantidade)
+
+
+def estatisticas():
+    """{tipo: {'hits', 'misses'}} desde o último zerar_estatisticas()."""
+    valores = cache.get_many([f'estatisticas:{tipo}:{nome}' for tipo in TIPOS for nome in ('hits', 'misses')])
+    return {
+        tipo: {nome: valores.get(f'estatisticas:{tipo}:{nome}', 0) for nome in ('hits', 'misses')}
+        for tipo in TIPOS
+    }
+
+
+def zerar_estatisticas():
+    cache.delete_many([f'estatisticas:{tipo}:{nome}' for tipo in TIPOS for nome in ('hits', 'misses')])
+
+
+# ---------------- Cards ----------------
+
+def cards_eventos(queryset):
+    """
+    HTML do card de cada evento de `queryset`, na ordem dele. Só os ids são
+    lidos da consulta; os eventos sem card em cache são carregados de uma
+    vez e renderizados.
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    if not ids:
+        return []
+    versoes = _versoes([_chave_versao(pk) for pk in ids])
+    chaves = {pk: f'evento:{pk}:card:{versoes[_chave_versao(pk)]}' for pk in ids}
+    cards = cache.get_many(list(chaves.values()))
+
+    faltando = [pk for pk in ids if chaves[pk] not in cards]
+    if faltando:
+        eventos = Event.objects.in_bulk(faltando)
+        novos = {
+            chaves[pk]: render_to_string(CARD, {'event': eventos[pk]})
+            for pk in faltando if pk in eventos
+        }
+        cache.set_many(novos, settings.EVENT_CACHE_TIMEOUT)
+        cards.update(novos)
+    _contar('card', len(ids) - len(faltando), len(faltando))
+    return [mark_safe(cards[chaves[pk]]) for pk in ids if chaves[pk] in cards]
+
+
+# ---------------- Páginas ----------------
+
+def pagina_publica(view):
+    """
+    Guarda a página inteira para visitantes anônimos, por URL e versão da
+    listagem. Usuários logados (saudação, menu) só aproveitam os cards.
+    """
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated or len(get_messages(request)):
+            return view(request, *args, **kwargs)
+
+        versao = _versoes([VERSAO_LISTAGEM])[VERSAO_LISTAGEM]
+        url = hashlib.sha256(request.get_full_path().encode()).hexdigest()[:32]
+        # A data entra porque as listagens só mostram eventos a partir de hoje
+        chave = f'pagina:{view.__name__}:{versao}:{date.today()}:{url}'
+        conteudo = cache.get(chave)
+        if conteudo is not None:
+            _contar('pagina', acertos=1)
+            return HttpResponse(conteudo)
+
+        _contar('pagina', falhas=1)
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(chave, response.content, settings.EVENT_CACHE_TIMEOUT)
+        return response
+    return inner
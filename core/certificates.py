@@ -0,0 +1,179 @@
+"""
+Emissão de certificados: cache em disco dos PDFs já gerados e emissão em
+lote (registros criados de uma vez, PDFs renderizados num pool de processos
+e entregues como um ZIP em fluxo).
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Certificate, Registration
+from .pdf import VERSAO_MODELO, gerar_certificado_pdf, renderizar_certificado
+from .utils import zip_stream
+
+
+def dados_certificado(certificado):
+    """Dados de um certificado em tipos simples, para envio aos processos do pool."""
+    user, event = certificado.user, certificado.event
+    return {
+        'id': certificado.id,
+        'nome': user.first_name or user.username,
+        'username': user.username,
+        'evento': event.title,
+        'inicio': event.start_date.strftime('%d/%m/%Y'),
+        'fim': event.end_date.strftime('%d/%m/%Y'),
+        'local': event.location,
+        'emitido_em': timezone.localtime(certificado.date_issued).strftime('%d/%m/%Y, às %H:%M'),
+        'logo_path': os.path.join(settings.BASE_DIR, 'static', 'image', 'sgea.jpg'),
+    }
+
+
+# ---------------- Cache em disco ----------------
+
+def impressao_digital(dados):
+    """Hash de tudo que aparece no PDF: muda se o nome do usuário ou o evento mudar."""
+    conteudo = {chave: valor for chave, valor in dados.items() if chave not in ('id', 'logo_path')}
+    conteudo['versao'] = VERSAO_MODELO
+    return hashlib.sha1(json.dumps(conteudo, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def caminho_cache(dados):
+    return Path(settings.CERTIFICATE_CACHE_DIR) / f"{dados['id']}-{impressao_digital(dados)}.pdf"
+
+
+def gravar_cache(dados, pdf):
+    """Grava o PDF no cache (escrita atômica) e apaga versões antigas do mesmo certificado."""
+    destino = caminho_cache(dados)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_suffix(f'.{os.getpid()}.tmp')
+    temporario.write_bytes(pdf)
+    os.replace(temporario, destino)
+    for antigo in destino.parent.glob(f"{dados['id']}-*.pdf"):
+        if antigo != destino:
+            antigo.unlink(missing_ok=True)
+    return destino
+
+
+def obter_pdf(certificado):
+    """Caminho do PDF do certificado, renderizando só se não estiver em cache."""
+    dados = dados_certificado(certificado)
+    caminho = caminho_cache(dados)
+    if caminho.exists():
+        return caminho, dados
+    return gravar_cache(dados, gerar_certificado_pdf(dados)), dados
+
+
+# ---------------- Emissão em lote ----------------
+
+def nome_arquivo(dados):
+    return f"certificado_{dados['username']}_{slugify(dados['evento'])}.pdf"
+
+
+def preparar_lote(event):
+    """
+    Garante um Certificate para cada participante do evento (um único
+    bulk_create) e devolve a lista de dados para renderização.
+    """
+    user_ids = Registration.objects.filter(event=event).values_list('user_id', flat=True)
+    Certificate.objects.bulk_create(
+        [Certificate(user_id=user_id, event=event) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    certificados = (
+        Certificate.objects.filter(event=event, user_id__in=user_ids)
+        .select_related('user')
+        .only('id', 'date_issued', 'event_id', 'user__id', 'user__username', 'user__first_name')
+        .order_by('user__username')
+    )
+    lote = []
+    for certificado in certificados:
+        certificado.event = event
+        lote.append(dados_certificado(certificado))
+    return lote
+
+
+def _do_cache(dados):
+    caminho = caminho_cache(dados)
+    if caminho.exists():
+        return dados, caminho.read_bytes(), None
+    return None
+
+
+def renderizar_em_lote(lote, workers=None):
+    """
+    Gera (dados, pdf, erro) na ordem do lote. PDFs em cache são lidos do disco;
+    os demais são renderizados (num pool de processos, se houver mais de um
+    worker) e gravados no cache. No máximo 2 PDFs por worker ficam em memória.
+    """
+    workers = workers or getattr(settings, 'CERTIFICATE_WORKERS', None) or os.cpu_count() or 1
+
+    def concluir(resultado):
+        dados, pdf, erro = resultado
+        if erro is None:
+            gravar_cache(dados, pdf)
+        return resultado
+
+    if workers <= 1 or len(lote) <= 1:
+        for dados in lote:
+            yield _do_cache(dados) or concluir(renderizar_certificado(dados))
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Cada item é o resultado pronto (cache) ou um Future, na ordem do lote
+        pendentes = deque()
+        for dados in lote:
+            pendentes.append(_do_cache(dados) or pool.submit(renderizar_certificado, dados))
+            if len(pendentes) >= workers * 2:
+                yield _resolver(pendentes.popleft(), concluir)
+        while pendentes:
+            yield _resolver(pendentes.popleft(), concluir)
+    finally:
+        # Também executa se o cliente desistir do download no meio
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _resolver(item, concluir):
+    return item if isinstance(item, tuple) else concluir(item.result())
+
+
+def arquivos_do_lote(lote, workers=None, progresso=None, ao_concluir=None):
+    """
+    Pares (nome, bytes) para o ZIP: um PDF por participante e, por último,
+    relatorio.csv com o resultado de cada um. `ao_concluir(ok, erros)` é
+    chamado depois do relatório, só se o lote for até o fim.
+    """
+    relatorio = io.StringIO()
+    writer = csv.writer(relatorio)
+    writer.writerow(['usuario', 'arquivo', 'status', 'erro'])
+    ok = erros = 0
+
+    for dados, pdf, erro in renderizar_em_lote(lote, workers):
+        arquivo = nome_arquivo(dados)
+        if erro is None:
+            ok += 1
+            writer.writerow([dados['username'], arquivo, 'ok', ''])
+            yield arquivo, pdf
+        else:
+            erros += 1
+            writer.writerow([dados['username'], '', 'erro', erro])
+        if progresso:
+            progresso(dados, erro)
+
+    yield 'relatorio.csv', relatorio.getvalue().encode('utf-8')
+    if ao_concluir:
+        ao_concluir(ok, erros)
+
+
+def zip_certificados(event, workers=None, progresso=None, ao_concluir=None):
+    """Gera o ZIP do lote em pedaços."""
+    return zip_stream(arquivos_do_lote(preparar_lote(event), workers, progresso, ao_concluir))
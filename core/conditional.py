@@ -0,0 +1,118 @@
+"""
+GET condicional (ETag / Last-Modified) das páginas e da API de eventos.
+
+Toda alteração de um evento renova Event.updated_at, inclusive inscrições e
+cancelamentos, que são UPDATEs diretos no contador. Como as páginas e a API
+mostram nome e e-mail do organizador e dos inscritos, editar esses campos de
+um usuário também renova os eventos dele (renovar_eventos_do_usuario). O estado das listagens
+cabe numa única consulta agregada: MAX(updated_at), que sai do índice, e
+COUNT(*), que muda quando um evento é excluído. Se o cliente já tem a versão
+atual, a view responde 304 sem montar o queryset nem renderizar nada.
+
+O ETag também leva a URL (filtros, busca, cursor), o usuário e, nas páginas,
+o cookie do CSRF, já que o HTML muda com eles. É fraco (W/) porque o token
+CSRF embutido no formulário muda a cada renderização.
+"""
+import hashlib
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .cache import invalidar_eventos
+from .models import Event
+
+# Campos do usuário exibidos junto com os eventos
+CAMPOS_USUARIO_EXIBIDOS = {'username', 'first_name', 'last_name', 'email'}
+
+
+def _aplica(request):
+    # Só GET/HEAD; e, nas páginas, nada de 304 com mensagens pendentes, que
+    # ficariam para a próxima página renderizada
+    return request.method in ('GET', 'HEAD') and not len(get_messages(request))
+
+
+def estado_eventos(request):
+    """(última alteração, total) de todos os eventos, consultado uma vez por requisição."""
+    if not hasattr(request, '_estado_eventos'):
+        estado = Event.objects.aggregate(ultima=Max('updated_at'), total=Count('id'))
+        request._estado_eventos = (estado['ultima'], estado['total'])
+    return request._estado_eventos
+
+
+def _etag(request, *partes):
+    user = request.user
+    if user.is_authenticated:
+        identidade = (user.pk, user.get_username(), user.first_name, getattr(user, 'role', ''))
+    else:
+        identidade = ('anonimo',)
+    bruto = '|'.join(str(parte) for parte in (
+        *partes, *identidade,
+        request.get_full_path(),
+        request.headers.get('Accept', ''),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ))
+    return 'W/"%s"' % hashlib.sha256(bruto.encode()).hexdigest()[:32]
+
+
+def renovar_eventos_do_usuario(user_id):
+    """Renova updated_at (e o cache) dos eventos que o usuário organiza ou em que está inscrito."""
+    ids = list(
+        Event.objects.filter(Q(organizer_id=user_id) | Q(participants=user_id))
+        .values_list('id', flat=True).distinct()
+    )
+    if ids:
+        Event.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+        invalidar_eventos(ids)
+
+
+# ---------------- LISTAGENS ----------------
+
+def etag_lista(request, *args, **kwargs):
+    if not _aplica(request):
+        return None
+    ultima, total = estado_eventos(request)
+    # A data entra porque, por padrão, as listagens só mostram eventos a
+    # partir de hoje
+    return _etag(request, ultima.isoformat() if ultima else '', total, date.today())
+
+
+def modificado_lista(request, *args, **kwargs):
+    if not _aplica(request):
+        return None
+    ultima, _ = estado_eventos(request)
+    inicio_do_dia = timezone.make_aware(datetime.combine(date.today(), time.min))
+    return max(ultima, inicio_do_dia) if ultima else inicio_do_dia
+
+
+lista_condicional = condition(etag_func=etag_lista, last_modified_func=modificado_lista)
+
+
+# ---------------- DETALHE ----------------
+
+def _alteracao_evento(request, event_id):
+    if not hasattr(request, '_alteracao_evento'):
+        request._alteracao_evento = (
+            Event.objects.filter(pk=event_id).values_list('updated_at', flat=True).first()
+        )
+    return request._alteracao_evento
+
+
+def etag_evento(request, event_id):
+    if not _aplica(request):
+        return None
+    alterado = _alteracao_evento(request, event_id)
+    # Evento inexistente: sem ETag, a view responde 404
+    return _etag(request, event_id, alterado.isoformat()) if alterado else None
+
+
+def modificado_evento(request, event_id):
+    if not _aplica(request):
+        return None
+    return _alteracao_evento(request, event_id)
+
+
+evento_condicional = condition(etag_func=etag_evento, last_modified_func=modificado_evento)
@@ -0,0 +1,167 @@
+"""
+Exportação das inscrições (participantes de um evento ou de todos os eventos
+de um organizador) em CSV e XLSX.
+
+As linhas vêm de Registration com .iterator(), já juntas ao usuário (e ao
+evento), e são escritas em pedaços para StreamingHttpResponse: a memória
+não cresce com o número de inscritos e o download começa na hora. O XLSX é
+montado à mão (SpreadsheetML mínimo, com strings inline) dentro de
+utils.zip_stream.
+"""
+import csv
+import io
+import re
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import Registration, User
+from .utils import zip_stream
+
+TAMANHO_PEDACO = 2000
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+COLUNAS_PARTICIPANTE = ['Nome', 'Usuário', 'E-mail', 'Telefone', 'Perfil', 'Inscrito em']
+COLUNAS_EVENTO = ['Evento', 'Data do evento']
+_CAMPOS_PARTICIPANTE = (
+    'user__first_name', 'user__last_name', 'user__username', 'user__email',
+    'user__phone', 'user__role', 'registered_at',
+)
+_PERFIS = dict(User.ROLE_CHOICES)
+
+
+# ---------------- Linhas ----------------
+
+def _participante(first_name, last_name, username, email, phone, role, registered_at):
+    return [
+        f'{first_name} {last_name}'.strip() or username,
+        username,
+        email,
+        phone or '',
+        _PERFIS.get(role, role),
+        timezone.localtime(registered_at).strftime('%d/%m/%Y %H:%M'),
+    ]
+
+
+def linhas_evento(event):
+    """Participantes de `event`, na ordem de inscrição."""
+    linhas = (
+        Registration.objects.filter(event=event)
+        .order_by('registered_at', 'id')
+        .values_list(*_CAMPOS_PARTICIPANTE)
+        .iterator(chunk_size=TAMANHO_PEDACO)
+    )
+    for linha in linhas:
+        yield _participante(*linha)
+
+
+def linhas_organizador(organizer):
+    """Inscrições de todos os eventos de `organizer`, evento a evento."""
+    linhas = (
+        Registration.objects.filter(event__organizer=organizer)
+        .order_by('event__start_date', 'event_id', 'registered_at', 'id')
+        .values_list('event__title', 'event__start_date', *_CAMPOS_PARTICIPANTE)
+        .iterator(chunk_size=TAMANHO_PEDACO)
+    )
+    for titulo, data, *participante in linhas:
+        yield [titulo, data.strftime('%d/%m/%Y'), *_participante(*participante)]
+
+
+# ---------------- CSV ----------------
+
+def _seguro(valor):
+    # Planilhas executam células que começam com =, +, - ou @
+    return "'" + valor if valor[:1] in ('=', '+', '-', '@', '\t', '\r') else valor
+
+
+def csv_stream(cabecalho, linhas):
+    """CSV (UTF-8 com BOM, para o Excel reconhecer os acentos) em pedaços."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(cabecalho)
+    for numero, linha in enumerate(linhas, 1):
+        writer.writerow([_seguro(valor) for valor in linha])
+        if numero % TAMANHO_PEDACO == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+# ---------------- XLSX ----------------
+
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_PARTES_FIXAS = {
+    '[Content_Types].xml': (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _workbook(aba):
+    return (
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(aba[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _linha_xml(linha):
+    celulas = ''.join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_INVALIDOS_XML.sub("", str(valor)))}</t></is></c>'
+        for valor in linha
+    )
+    return f'<row>{celulas}</row>'
+
+
+def _planilha(cabecalho, linhas):
+    yield (_XML + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+           '<sheetData>' + _linha_xml(cabecalho)).encode('utf-8')
+    pedaco = []
+    for linha in linhas:
+        pedaco.append(_linha_xml(linha))
+        if len(pedaco) == TAMANHO_PEDACO:
+            yield ''.join(pedaco).encode('utf-8')
+            pedaco = []
+    yield (''.join(pedaco) + '</sheetData></worksheet>').encode('utf-8')
+
+
+def xlsx_stream(cabecalho, linhas, aba='Inscrições'):
+    """Planilha XLSX de uma aba, gerada em pedaços."""
+    partes = [(nome, (_XML + xml).encode('utf-8')) for nome, xml in _PARTES_FIXAS.items()]
+    partes.append(('xl/workbook.xml', (_XML + _workbook(aba)).encode('utf-8')))
+    partes.append(('xl/worksheets/sheet1.xml', _planilha(cabecalho, linhas)))
+    return zip_stream(partes)
+
+
+def exportar(formato, cabecalho, linhas):
+    """Gerador de bytes no `formato` pedido ('csv' ou 'xlsx')."""
+    if formato == 'xlsx':
+        return xlsx_stream(cabecalho, linhas)
+    return csv_stream(cabecalho, linhas)
@@ -2,9 +2,11 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from datetime import date, timedelta
+from django.db.models import F
+from datetime import date, datetime, time, timedelta
 import re
-from .models import Event
+from django.utils import timezone
+from .models import AuditLog, Event
 
 
 User = get_user_model()
@@ -149,3 +151,107 @@ class EventForm(forms.ModelForm):
                 "O número de participantes deve ser maior que zero."
             )
         return max_p
+
+
+# ------------------ EVENT FILTER FORM ------------------
+class EventFilterForm(forms.Form):
+    """
+    Filtros da listagem de eventos (web e API). Sem data inicial nem
+    `past`, mostra só os eventos a partir de hoje, para que a consulta
+    percorra apenas a parte do índice de start_date que interessa; a busca
+    textual (`?q=`) desliga esse padrão e procura em todos os eventos.
+    """
+    date_from = forms.DateField(label='De', required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(label='Até', required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    event_type = forms.ChoiceField(
+        label='Tipo', required=False,
+        choices=(('', 'Todos'),) + Event.EVENT_TYPE_CHOICES,
+    )
+    organizer = forms.IntegerField(label='Organizador', required=False, min_value=1, widget=forms.HiddenInput)
+    has_seats = forms.BooleanField(label='Só com vagas', required=False)
+    past = forms.BooleanField(label='Incluir eventos passados', required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            raise ValidationError("A data final não pode ser anterior à data inicial.")
+        return cleaned_data
+
+    def filtrar(self, queryset, somente_futuros=True):
+        """
+        Aplica os filtros a um queryset de Event. Com somente_futuros=False
+        não há corte padrão em hoje. Com filtros inválidos não há resultados
+        (os erros aparecem no formulário), em vez de a listagem ignorá-los.
+        """
+        if not self.is_valid():
+            return queryset.none()
+        dados = self.cleaned_data
+        date_from = dados.get('date_from')
+        if date_from is None and somente_futuros and not dados.get('past'):
+            date_from = date.today()
+        if date_from:
+            queryset = queryset.filter(start_date__gte=date_from)
+        if dados.get('date_to'):
+            queryset = queryset.filter(start_date__lte=dados['date_to'])
+        if dados.get('event_type'):
+            queryset = queryset.filter(event_type=dados['event_type'])
+        if dados.get('organizer'):
+            queryset = queryset.filter(organizer_id=dados['organizer'])
+        if dados.get('has_seats'):
+            queryset = queryset.filter(participants_count__lt=F('max_participants'))
+        return queryset
+
+
+# ------------------ AUDIT LOG FILTER FORM ------------------
+class AuditLogFilterForm(forms.Form):
+    """
+    Filtros do visualizador de logs. Cada filtro tem um índice que termina
+    em (timestamp, id), a ordem da paginação, então a consulta nunca
+    ordena em memória.
+    """
+    model = forms.CharField(label='Modelo', required=False, max_length=50)
+    action = forms.ChoiceField(label='Ação', required=False, choices=(('', 'Todas'),) + tuple(AuditLog.ACTION_CHOICES))
+    user = forms.CharField(label='Usuário', required=False, max_length=150)
+    date_from = forms.DateField(label='De', required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(label='Até', required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    # Busca nas partições de core/archive.py em vez do banco
+    archived = forms.BooleanField(label='Arquivados', required=False)
+
+    def clean_user(self):
+        username = self.cleaned_data.get('user', '').strip()
+        if not username:
+            return None
+        user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+        if user_id is None:
+            raise ValidationError("Usuário não encontrado.")
+        return user_id
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            raise ValidationError("A data final não pode ser anterior à data inicial.")
+        return cleaned_data
+
+    def filtrar(self, queryset):
+        """
+        Aplica os filtros a um queryset de AuditLog. Com filtros inválidos
+        (ex.: usuário inexistente) não há resultados.
+        """
+        if not self.is_valid():
+            return queryset.none()
+        dados = self.cleaned_data
+        if dados.get('model'):
+            queryset = queryset.filter(model=dados['model'])
+        if dados.get('action'):
+            queryset = queryset.filter(action=dados['action'])
+        if dados.get('user'):
+            queryset = queryset.filter(user_id=dados['user'])
+        # Datas viram intervalos de timestamp (e não timestamp__date), para usar o índice
+        if dados.get('date_from'):
+            queryset = queryset.filter(timestamp__gte=timezone.make_aware(datetime.combine(dados['date_from'], time.min)))
+        if dados.get('date_to'):
+            fim = dados['date_to'] + timedelta(days=1)
+            queryset = queryset.filter(timestamp__lt=timezone.make_aware(datetime.combine(fim, time.min)))
+        return queryset
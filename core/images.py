@@ -0,0 +1,160 @@
+"""
+Variantes redimensionadas do banner dos eventos.
+
+Cada banner enviado gera, para cada tamanho de VARIANTES, uma versão WebP e
+outra JPEG sem metadados EXIF, gravadas ao lado do original em
+event_banners/variants/. Os caminhos ficam em Event.banner_variants:
+
+    {"source": "event_banners/x.jpg",
+     "thumb": {"width": 400, "height": 225, "webp": "...", "jpeg": "..."},
+     "medium": {...}}
+
+O processamento roda numa thread depois do commit (agendar_processamento),
+fora do ciclo da requisição; o comando process_banners refaz os antigos.
+"""
+import io
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidar_evento
+from .models import Event
+
+# Largura máxima de cada variante; imagens menores não são ampliadas
+VARIANTES = {
+    'thumb': 400,    # cards das listagens
+    'medium': 1200,  # página do evento
+}
+QUALIDADE = {'webp': 80, 'jpeg': 82}
+PASTA = 'event_banners/variants'
+
+
+def _codificar(imagem, formato):
+    saida = io.BytesIO()
+    if formato == 'jpeg':
+        if imagem.mode in ('RGBA', 'LA', 'P'):
+            # JPEG não tem transparência: aplica sobre fundo branco
+            imagem = imagem.convert('RGBA')
+            fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+            fundo.paste(imagem, mask=imagem.getchannel('A'))
+            imagem = fundo
+        imagem.convert('RGB').save(saida, 'JPEG', quality=QUALIDADE['jpeg'], optimize=True, progressive=True)
+    else:
+        if imagem.mode not in ('RGB', 'RGBA'):
+            imagem = imagem.convert('RGBA')
+        imagem.save(saida, 'WEBP', quality=QUALIDADE['webp'], method=6)
+    # Sem o argumento exif= o Pillow não copia metadados para o arquivo novo
+    return saida.getvalue()
+
+
+def gerar_variantes(banner):
+    """Grava as variantes de um FieldFile e devolve o dict para banner_variants."""
+    storage = banner.storage
+    with storage.open(banner.name, 'rb') as arquivo:
+        original = Image.open(arquivo)
+        # Aplica a rotação do EXIF antes de descartá-lo
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    resultado = {'source': banner.name}
+    for tamanho, largura in VARIANTES.items():
+        imagem = original.copy()
+        if imagem.width > largura:
+            altura = round(imagem.height * largura / imagem.width)
+            imagem = imagem.resize((largura, altura), Image.Resampling.LANCZOS)
+        variante = {'width': imagem.width, 'height': imagem.height}
+        for formato in QUALIDADE:
+            extensao = 'jpg' if formato == 'jpeg' else formato
+            # O storage troca o nome pelo hash do conteúdo
+            variante[formato] = storage.save(
+                f'{PASTA}/{tamanho}.{extensao}', ContentFile(_codificar(imagem, formato))
+            )
+        resultado[tamanho] = variante
+    return resultado
+
+
+def remover_variantes(variantes, manter=None):
+    """
+    Apaga os arquivos de `variantes` que não estão em `manter`. Nada é
+    apagado se outro evento ainda usa o mesmo banner (e, portanto, as mesmas
+    variantes).
+    """
+    manter = manter or {}
+    fonte = variantes.get('source')
+    if fonte and Event.objects.filter(banner=fonte).exists():
+        return
+    storage = Event._meta.get_field('banner').storage
+    preservados = {
+        variante.get(formato)
+        for variante in manter.values() if isinstance(variante, dict)
+        for formato in QUALIDADE
+    }
+    for variante in variantes.values():
+        if not isinstance(variante, dict):
+            continue
+        for formato in QUALIDADE:
+            nome = variante.get(formato)
+            if nome and nome not in preservados:
+                storage.delete(nome)
+
+
+def processar_banner(event_id, forcar=False):
+    """
+    Gera (ou apaga) as variantes do banner atual do evento. Retorna True se
+    banner_variants foi alterado.
+    """
+    event = Event.objects.filter(pk=event_id).only('id', 'banner', 'banner_variants').first()
+    if event is None:
+        return False
+    antigas = event.banner_variants or {}
+    if event.banner:
+        if antigas.get('source') == event.banner.name and not forcar:
+            return False
+        # Mesmo arquivo já processado para outro evento: reaproveita
+        novas = None if forcar else (
+            Event.objects.filter(banner=event.banner.name, banner_variants__source=event.banner.name)
+            .exclude(pk=event.pk).values_list('banner_variants', flat=True).first()
+        )
+        novas = novas or gerar_variantes(event.banner)
+    else:
+        if not antigas:
+            return False
+        novas = {}
+
+    # Só grava se o banner não foi trocado enquanto as variantes eram geradas;
+    # se foi, a execução agendada pela troca cuida do banner novo.
+    alterado = Event.objects.filter(pk=event.pk, banner=event.banner.name).update(
+        banner_variants=novas, updated_at=timezone.now()
+    )
+    if alterado:
+        invalidar_evento(event.pk)
+        remover_variantes(antigas, manter=novas)
+    else:
+        remover_variantes(novas)
+    return bool(alterado)
+
+
+def liberar_banner(nome):
+    """Apaga o arquivo do banner se nenhum evento o usa mais."""
+    if nome and not Event.objects.filter(banner=nome).exists():
+        Event._meta.get_field('banner').storage.delete(nome)
+
+
+def _processar_em_thread(event_id):
+    try:
+        processar_banner(event_id)
+    finally:
+        # A thread abriu sua própria conexão com o banco
+        connection.close()
+
+
+def agendar_processamento(event_id):
+    """Processa o banner em segundo plano (ou na hora, com BANNER_PROCESSING_ASYNC=False)."""
+    if getattr(settings, 'BANNER_PROCESSING_ASYNC', True):
+        threading.Thread(target=_processar_em_thread, args=(event_id,), daemon=True).start()
+    else:
+        processar_banner(event_id)
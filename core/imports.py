@@ -0,0 +1,122 @@
+"""
+Importação de participantes a partir de um CSV de usernames ou e-mails.
+
+O arquivo pode ter cabeçalho (a coluna username/usuario/email/e-mail é
+usada) ou não (vale a primeira coluna), separado por vírgula, ponto e
+vírgula ou tabulação. Os identificadores são resolvidos numa única
+consulta e as inscrições criadas por registrations.inscrever_em_lote, que
+confere as vagas uma vez para o lote inteiro.
+"""
+import csv
+import io
+from collections import Counter
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import User
+from .registrations import inscrever_em_lote
+from .utils import registrar_log
+
+# Estados de cada linha além dos de registrations (INSCRITO, JA_INSCRITO,
+# LOTADO, ORGANIZADOR)
+DESCONHECIDO = 'unknown'
+REPETIDO = 'duplicate'
+
+CABECALHOS = {'username', 'usuario', 'usuário', 'login', 'email', 'e-mail'}
+# Mantém o IN da consulta de usuários abaixo do limite de parâmetros do SQLite
+LIMITE_LINHAS = 20000
+
+
+def _texto(conteudo):
+    if isinstance(conteudo, str):
+        return conteudo
+    try:
+        return conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        # Planilhas salvas pelo Excel em português
+        return conteudo.decode('cp1252', errors='replace')
+
+
+def ler_identificadores(conteudo):
+    """Lista de (número da linha, identificador) do CSV."""
+    texto = _texto(conteudo)
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialeto = csv.excel
+
+    identificadores, coluna = [], 0
+    for numero, linha in enumerate(csv.reader(io.StringIO(texto), dialeto), 1):
+        celulas = [celula.strip() for celula in linha]
+        if numero == 1:
+            nomes = [celula.lower() for celula in celulas]
+            cabecalho = next((i for i, nome in enumerate(nomes) if nome in CABECALHOS), None)
+            if cabecalho is not None:
+                coluna = cabecalho
+                continue
+        valor = celulas[coluna] if coluna < len(celulas) else ''
+        if valor:
+            identificadores.append((numero, valor))
+            if len(identificadores) > LIMITE_LINHAS:
+                raise ValueError(f"O arquivo tem mais de {LIMITE_LINHAS} linhas.")
+    return identificadores
+
+
+def resolver_usuarios(identificadores):
+    """{identificador: user_id} com uma única consulta (e-mails sem distinção de caixa)."""
+    emails = {valor.lower() for valor in identificadores if '@' in valor}
+    usernames = {valor for valor in identificadores if '@' not in valor}
+    por_email, por_username = {}, {}
+    usuarios = (
+        User.objects.annotate(email_minusculo=Lower('email'))
+        .filter(Q(username__in=usernames) | Q(email_minusculo__in=emails))
+        .order_by('id')
+        .values_list('id', 'username', 'email_minusculo')
+    )
+    for user_id, username, email in usuarios:
+        por_username[username] = user_id
+        # E-mail repetido entre contas: fica a mais antiga
+        por_email.setdefault(email, user_id)
+    return {
+        valor: por_email.get(valor.lower()) if '@' in valor else por_username.get(valor)
+        for valor in identificadores
+    }
+
+
+def importar_participantes(event, conteudo, por=None):
+    """
+    Importa o CSV `conteudo` (bytes ou texto) para `event`. Retorna
+    {'resumo': {estado: quantidade}, 'linhas': [{'linha', 'valor', 'status'}]}.
+    """
+    identificadores = ler_identificadores(conteudo)
+    usuarios = resolver_usuarios({valor for _, valor in identificadores})
+
+    linhas, ordem, pendentes = [], [], {}
+    for numero, valor in identificadores:
+        user_id = usuarios[valor]
+        linha = {'linha': numero, 'valor': valor, 'status': DESCONHECIDO}
+        if user_id in pendentes:
+            linha['status'] = REPETIDO
+        elif user_id is not None:
+            # O estado sai da inscrição em lote
+            pendentes[user_id] = linha
+            ordem.append(user_id)
+        linhas.append(linha)
+
+    if ordem:
+        for user_id, status in inscrever_em_lote(event, ordem).items():
+            pendentes[user_id]['status'] = status
+
+    resumo = Counter(linha['status'] for linha in linhas)
+    registrar_log(
+        user=por,
+        action="CREATE",
+        model="Registration",
+        object_id=f"IMPORT-{event.id}",
+        description=(
+            f"Importação de participantes no evento {event.title}: "
+            + ", ".join(f"{quantidade} {status}" for status, quantidade in sorted(resumo.items()))
+        )
+    )
+    return {'resumo': dict(resumo), 'linhas': linhas}
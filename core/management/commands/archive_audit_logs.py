@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from core.archive import TAMANHO_LOTE, arquivar_logs, data_limite
+from core.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = "Move para partições .jsonl.gz os logs de auditoria mais antigos que o prazo de retenção"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Prazo de retenção em dias (padrão: AUDIT_LOG_RETENTION_DAYS)")
+        parser.add_argument('--dry-run', action='store_true', help="Só conta as entradas de cada dia")
+        parser.add_argument('--batch-size', type=int, default=TAMANHO_LOTE, help="Entradas apagadas por DELETE")
+        parser.add_argument('--vacuum', action='store_true', help="Roda VACUUM no fim para devolver o espaço ao disco")
+
+    def handle(self, *args, **options):
+        limite = data_limite(options['days'])
+        resultado = arquivar_logs(limite, apagar=not options['dry_run'], lote=options['batch_size'])
+        for dia, quantidade in resultado.items():
+            self.stdout.write(f"{dia:%d/%m/%Y}: {quantidade} entrada(s)")
+        total = sum(resultado.values())
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"{total} entrada(s) anteriores a {limite:%d/%m/%Y} seriam arquivadas."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(f"{total} entrada(s) arquivada(s) em {settings.AUDIT_ARCHIVE_DIR}."))
+
+        connection = connections[router.db_for_write(AuditLog)]
+        if options['vacuum'] and total and connection.vendor == 'sqlite':
+            # O SQLite não encolhe o arquivo ao apagar; o VACUUM reescreve o
+            # banco inteiro e bloqueia as escritas enquanto roda
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write("Banco compactado.")
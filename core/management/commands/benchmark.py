@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import benchmark
+
+ORCAMENTO_PADRAO = Path(benchmark.__file__).resolve().parent / 'benchmark_budget.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede queries, latência (p50/p95) e tamanho da resposta de todas as rotas "
+        "do app num banco de teste e falha se o orçamento for excedido"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--events', type=int, default=50)
+        parser.add_argument('--registrations-per-event', type=int, default=40)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=5, help="Requisições por rota")
+        parser.add_argument('--routes', help="Mede só estas rotas (nomes separados por vírgula)")
+        parser.add_argument('--budget', default=str(ORCAMENTO_PADRAO),
+                            help="Arquivo JSON com os limites (vazio para não verificar)")
+        parser.add_argument('--output', help="Grava o relatório JSON neste arquivo em vez da saída padrão")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Um banco de teste por alias (o 'audit' também, se estiver ativo)
+        nomes_originais = {
+            alias: connections[alias].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            for alias in connections
+        }
+        try:
+            dados = benchmark.semear(
+                users=options['users'],
+                events=options['events'],
+                registrations_per_event=options['registrations_per_event'],
+                seed=options['seed'],
+            )
+            rotas = [nome.strip() for nome in (options['routes'] or '').split(',') if nome.strip()]
+            resultados = benchmark.rodar(dados, repeat=options['repeat'], rotas=rotas)
+            planos, violacoes_planos = benchmark.verificar_planos(dados)
+        finally:
+            for alias, nome_original in nomes_originais.items():
+                connections[alias].creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        violacoes = list(violacoes_planos)
+        if options['budget']:
+            violacoes += benchmark.verificar_orcamento(resultados, benchmark.carregar_orcamento(options['budget']))
+
+        relatorio = json.dumps({
+            'dataset': {
+                'users': options['users'],
+                'events': options['events'],
+                'registrations_per_event': options['registrations_per_event'],
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+            },
+            'routes': resultados,
+            'query_plans': planos,
+            'violations': violacoes,
+        }, indent=2, sort_keys=True)
+
+        if options['output']:
+            Path(options['output']).write_text(relatorio + '\n', encoding='utf-8')
+        else:
+            self.stdout.write(relatorio)
+
+        if violacoes:
+            raise CommandError(f"{len(violacoes)} limite(s) do orçamento excedido(s).")
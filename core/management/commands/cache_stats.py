@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.cache import estatisticas, zerar_estatisticas
+
+
+class Command(BaseCommand):
+    help = "Mostra os acertos e falhas do cache de páginas e cards de eventos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zera os contadores depois de mostrar")
+
+    def handle(self, *args, **options):
+        if 'locmem' in settings.CACHES['default']['BACKEND']:
+            self.stdout.write(self.style.WARNING(
+                "Cache em memória local: este comando só enxerga os contadores do próprio processo "
+                "(use CACHE_BACKEND=file para ver os do servidor)."
+            ))
+        for tipo, valores in estatisticas().items():
+            total = valores['hits'] + valores['misses']
+            taxa = f"{100 * valores['hits'] / total:.1f}%" if total else "-"
+            self.stdout.write(f"{tipo}: {valores['hits']} acerto(s), {valores['misses']} falha(s), taxa {taxa}")
+        if options['reset']:
+            zerar_estatisticas()
+            self.stdout.write("Contadores zerados.")
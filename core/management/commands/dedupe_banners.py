@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from core.images import processar_banner
+from core.models import Event
+
+
+class Command(BaseCommand):
+    help = "Renomeia os banners existentes pelo hash do conteúdo, unificando arquivos repetidos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Só mostra o que seria feito")
+        parser.add_argument('--delete-orphans', action='store_true',
+                            help="Também apaga banners que nenhum evento usa")
+
+    def handle(self, *args, **options):
+        storage = Event._meta.get_field('banner').storage
+        pasta = Event._meta.get_field('banner').upload_to.rstrip('/')
+        dry_run = options['dry_run']
+
+        # Agrupa os arquivos da pasta de banners (sem as variantes) pelo nome
+        # que teriam no armazenamento por conteúdo
+        grupos = defaultdict(list)
+        _, arquivos = storage.listdir(pasta)
+        for arquivo in sorted(arquivos):
+            nome = f'{pasta}/{arquivo}'
+            with storage.open(nome, 'rb') as conteudo:
+                grupos[storage.nome_por_conteudo(nome, File(conteudo))].append(nome)
+
+        referencias = defaultdict(list)
+        for event_id, banner in Event.objects.exclude(banner='').exclude(banner__isnull=True).values_list('id', 'banner'):
+            referencias[banner].append(event_id)
+
+        economia = apagados = atualizados = 0
+        for canonico, nomes in grupos.items():
+            eventos = [event_id for nome in nomes for event_id in referencias.get(nome, [])]
+            if not eventos and not options['delete_orphans']:
+                continue
+            if nomes == [canonico] and (eventos or not options['delete_orphans']):
+                continue
+
+            if eventos:
+                self.stdout.write(f"{canonico} <- {', '.join(nomes)} ({len(eventos)} evento(s))")
+            else:
+                self.stdout.write(f"órfão: {', '.join(nomes)}")
+            if dry_run:
+                continue
+
+            if eventos:
+                if not storage.exists(canonico):
+                    with storage.open(nomes[0], 'rb') as conteudo:
+                        storage.save(canonico, File(conteudo))
+                atualizados += Event.objects.filter(id__in=eventos).update(banner=canonico)
+                # O banner mudou de nome: as variantes são refeitas (ou
+                # reaproveitadas) e as antigas, agora sem uso, apagadas
+                for event_id in eventos:
+                    processar_banner(event_id)
+            for nome in nomes:
+                if nome != canonico or not eventos:
+                    economia += storage.size(nome)
+                    storage.delete(nome)
+                    apagados += 1
+
+        if dry_run:
+            self.stdout.write("Nada foi alterado (--dry-run).")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{atualizados} evento(s) atualizado(s), {apagados} arquivo(s) apagado(s), "
+            f"{economia / 1024:.0f} KiB liberados."
+        ))
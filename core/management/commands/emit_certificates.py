@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.certificates import zip_certificados
+from core.models import Event
+
+
+class Command(BaseCommand):
+    help = "Emite os certificados de todos os participantes de um evento num arquivo ZIP"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int)
+        parser.add_argument('--output', help="Arquivo ZIP de saída (padrão: certificados_<id>.zip)")
+        parser.add_argument('--workers', type=int, help="Processos de renderização (padrão: CERTIFICATE_WORKERS ou nº de CPUs)")
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError("Evento não encontrado.")
+
+        destino = Path(options['output'] or f"certificados_{event.id}.zip")
+        falhas = 0
+
+        def progresso(dados, erro):
+            nonlocal falhas
+            if erro is None:
+                self.stdout.write(f"  ok    {dados['username']}")
+            else:
+                falhas += 1
+                self.stderr.write(f"  erro  {dados['username']}: {erro}")
+
+        with destino.open('wb') as arquivo:
+            for pedaco in zip_certificados(event, options['workers'], progresso):
+                arquivo.write(pedaco)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Certificados de '{event.title}' gravados em {destino} ({falhas} falha(s))."
+        ))
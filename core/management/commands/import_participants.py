@@ -0,0 +1,37 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import importar_participantes
+from core.models import Event
+
+
+class Command(BaseCommand):
+    help = "Inscreve num evento os usuários (usernames ou e-mails) de um arquivo CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int)
+        parser.add_argument('arquivo', help="CSV com uma coluna de usernames ou e-mails")
+        parser.add_argument('--report', help="Grava o resultado de cada linha neste CSV")
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.select_related('organizer').get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError(f"Evento {options['event_id']} não encontrado.")
+        try:
+            conteudo = Path(options['arquivo']).read_bytes()
+            relatorio = importar_participantes(event, conteudo, por=event.organizer)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8', newline='') as saida:
+                writer = csv.DictWriter(saida, fieldnames=['linha', 'valor', 'status'])
+                writer.writeheader()
+                writer.writerows(relatorio['linhas'])
+
+        for status, quantidade in sorted(relatorio['resumo'].items()):
+            self.stdout.write(f"{status}: {quantidade}")
+        self.stdout.write(self.style.SUCCESS(f"{len(relatorio['linhas'])} linha(s) processada(s)."))
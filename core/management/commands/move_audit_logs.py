@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+from core.archive import CAMPOS, TAMANHO_LOTE, gravar_entradas
+from core.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = "Move os logs de auditoria do banco principal para o banco de auditoria (AUDIT_DB_SEPARATE)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=TAMANHO_LOTE)
+
+    def handle(self, *args, **options):
+        destino = router.db_for_write(AuditLog)
+        if destino == DEFAULT_DB_ALIAS:
+            raise CommandError("O banco de auditoria não está ativo (AUDIT_DB_SEPARATE=1).")
+        if AuditLog._meta.db_table not in connections[DEFAULT_DB_ALIAS].introspection.table_names():
+            self.stdout.write("Nada a mover.")
+            return
+
+        origem = AuditLog.objects.using(DEFAULT_DB_ALIAS).order_by('id')
+        total = 0
+        while lote := list(origem.values(*CAMPOS)[:options['batch_size']]):
+            ids = [registro['id'] for registro in lote]
+            # Id já usado no destino por outra entrada (gravada depois de ativar
+            # o banco novo): copiar perderia uma das duas
+            presentes = dict(AuditLog.objects.filter(pk__in=ids).values_list('id', 'timestamp'))
+            colisoes = [r['id'] for r in lote if r['id'] in presentes and presentes[r['id']] != r['timestamp']]
+            if colisoes:
+                raise CommandError(
+                    f"Os ids {colisoes[:5]} já existem no banco de auditoria com outro conteúdo. "
+                    "Mova os logs antes de gravar auditoria no banco novo."
+                )
+            gravar_entradas([AuditLog(**registro) for registro in lote])
+            AuditLog.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=ids).delete()
+            total += len(lote)
+
+        self.stdout.write(self.style.SUCCESS(f"{total} entrada(s) movida(s) para o banco '{destino}'."))
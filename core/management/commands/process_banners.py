@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.images import processar_banner
+from core.models import Event
+
+
+class Command(BaseCommand):
+    help = "Gera as variantes redimensionadas dos banners que ainda não foram processados"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Refaz as variantes de todos os banners (ex.: após mudar os tamanhos)")
+
+    def handle(self, *args, **options):
+        ids = (
+            Event.objects.exclude(banner='').exclude(banner__isnull=True)
+            .order_by('id').values_list('id', flat=True)
+        )
+        processados = falhas = 0
+        for event_id in list(ids):
+            try:
+                if processar_banner(event_id, forcar=options['force']):
+                    processados += 1
+            except (OSError, ValueError) as erro:
+                # Arquivo ausente ou imagem corrompida não interrompe o restante
+                falhas += 1
+                self.stderr.write(f"  evento {event_id}: {erro}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{processados} banner(s) processado(s), {falhas} falha(s)."
+        ))
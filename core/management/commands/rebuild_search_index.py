@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.search import fts_disponivel, reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice de busca textual dos eventos (FTS5)"
+
+    def handle(self, *args, **options):
+        if not fts_disponivel():
+            self.stdout.write("O banco atual não usa FTS5; nada a fazer.")
+            return
+        with transaction.atomic():
+            total = reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS(f"{total} evento(s) indexado(s)."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.cache import invalidar_eventos
+from core.models import Event, Registration
+
+
+class Command(BaseCommand):
+    help = "Recalcula Event.participants_count a partir das inscrições"
+
+    def handle(self, *args, **kwargs):
+        total = (
+            Registration.objects.filter(event_id=OuterRef('pk'))
+            .order_by()
+            .values('event_id')
+            .annotate(c=Count('*'))
+            .values('c')
+        )
+        real = Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+        with transaction.atomic():
+            # Um único UPDATE ... SET = (SELECT COUNT ...) para os eventos com
+            # divergência; os demais não são reescritos (nem saem do cache).
+            divergentes = Event.objects.alias(real=real).exclude(participants_count=real)
+            ids = list(divergentes.values_list('id', flat=True))
+            corrigidos = Event.objects.filter(pk__in=ids).update(participants_count=real, updated_at=timezone.now())
+            invalidar_eventos(ids)
+
+        self.stdout.write(self.style.SUCCESS(f"{corrigidos} evento(s) corrigido(s)."))
@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import carregar_indice, restaurar_particao
+
+
+class Command(BaseCommand):
+    help = "Devolve ao banco as partições arquivadas dos logs de auditoria (sem argumentos, lista as partições)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dias', nargs='*', help="Dias das partições, no formato AAAA-MM-DD")
+
+    def handle(self, *args, **options):
+        if not options['dias']:
+            for dia, particao in sorted(carregar_indice().items()):
+                self.stdout.write(
+                    f"{dia}: {particao['linhas']} entrada(s), ids {particao['primeiro']} a {particao['ultimo']}"
+                )
+            return
+
+        for texto in options['dias']:
+            try:
+                dia = date.fromisoformat(texto)
+            except ValueError:
+                raise CommandError(f"Data inválida: {texto} (use AAAA-MM-DD).")
+            try:
+                total = restaurar_particao(dia)
+            except FileNotFoundError:
+                raise CommandError(f"Não há partição arquivada de {texto}.")
+            self.stdout.write(self.style.SUCCESS(f"{texto}: {total} entrada(s) restaurada(s)."))
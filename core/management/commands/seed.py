@@ -1,12 +1,31 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 
+from core import seeding
+
 User = get_user_model()
 
 class Command(BaseCommand):
-    help = "Cria usuários iniciais (organizador, professor e aluno)"
+    help = (
+        "Cria usuários iniciais (organizador, professor e aluno). Com --users/--events "
+        "gera um dataset sintético grande e reproduzível para testes de desempenho"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, help="Usuários sintéticos a gerar")
+        parser.add_argument('--events', type=int, default=0, help="Eventos sintéticos a gerar")
+        parser.add_argument('--registrations-per-event', type=int, default=0)
+        parser.add_argument('--seed', type=int, default=42, help="Semente do gerador (mesma semente, mesmo dataset)")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Linhas por bulk_create")
+        parser.add_argument('--reset', action='store_true', help="Apaga o dataset sintético anterior antes de gerar")
 
     def handle(self, *args, **kwargs):
+        if kwargs['users'] is not None or kwargs['reset']:
+            self.gerar_sintetico(kwargs)
+            return
+
         users = [
             {"username": "organizador", "password": "Admin@123", "role": "organizer", "email": "organizador@sgea.com"},
             {"username": "professor", "password": "Professor@123", "role": "teacher", "email": "professor@sgea.com"},
@@ -23,3 +42,27 @@ class Command(BaseCommand):
                 )
 
         self.stdout.write(self.style.SUCCESS("Usuários padrão criados com sucesso!"))
+
+    def gerar_sintetico(self, opcoes):
+        if opcoes['reset']:
+            seeding.apagar_dataset()
+            self.stdout.write("Dataset sintético anterior removido.")
+        if opcoes['users'] is None:
+            return
+        if User.objects.filter(username__startswith=f'{seeding.PREFIXO}user_').exists():
+            raise CommandError("Já existe um dataset sintético; use --reset para recriá-lo.")
+
+        inicio = time.perf_counter()
+        criados = seeding.gerar_dataset(
+            users=opcoes['users'],
+            events=opcoes['events'],
+            registrations_per_event=opcoes['registrations_per_event'],
+            seed=opcoes['seed'],
+            chunk_size=opcoes['chunk_size'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{criados['users']} usuários, {criados['events']} eventos e {criados['registrations']} "
+            f"inscrições gerados em {time.perf_counter() - inicio:.1f}s "
+            f"(senha de todos: {seeding.SENHA})"
+        ))
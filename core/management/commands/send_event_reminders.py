@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.reminders import enviar_lembretes
+
+
+class Command(BaseCommand):
+    help = "Envia lembretes por e-mail aos participantes dos eventos que começam em breve"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=settings.EVENT_REMINDER_WINDOW_HOURS,
+                            help="Avisa sobre eventos que começam nas próximas N horas")
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Mensagens por chamada a send_messages")
+
+    def handle(self, *args, **options):
+        resultado = enviar_lembretes(timedelta(hours=options['hours']), options['chunk_size'])
+        for event, enviados in resultado.items():
+            self.stdout.write(f"  {event.title}: {enviados} lembrete(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(resultado.values())} lembrete(s) enviado(s) para {len(resultado)} evento(s)."
+        ))
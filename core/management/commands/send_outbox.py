@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.outbox import enviar_lote
+
+
+class Command(BaseCommand):
+    help = "Envia os e-mails pendentes da fila (EmailOutbox)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+                            help="Mensagens enviadas por conexão SMTP")
+        parser.add_argument('--per-minute', type=int, default=settings.EMAIL_OUTBOX_PER_MINUTE,
+                            help="Máximo de envios por minuto (0 = sem limite)")
+        parser.add_argument('--loop', action='store_true',
+                            help="Continua rodando e verifica a fila a cada --interval segundos")
+        parser.add_argument('--interval', type=float, default=10,
+                            help="Espera entre verificações quando não há o que enviar")
+
+    def handle(self, *args, **options):
+        totais = {'sent': 0, 'retry': 0, 'failed': 0}
+        while True:
+            resultado = enviar_lote(options['batch_size'], options['per_minute'])
+            for chave in totais:
+                totais[chave] += resultado[chave]
+            if resultado['sent'] or resultado['retry'] or resultado['failed']:
+                self.stdout.write(
+                    f"{resultado['sent']} enviado(s), {resultado['retry']} reagendado(s), "
+                    f"{resultado['failed']} descartado(s)"
+                )
+                continue
+            # Fila vazia (ou limite por minuto atingido)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: {totais['sent']} enviado(s), {totais['retry']} reagendado(s), {totais['failed']} descartado(s)."
+        ))
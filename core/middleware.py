@@ -0,0 +1,12 @@
+from .utils import audit_log_buffer
+
+
+class AuditLogMiddleware:
+    """Grava toda a auditoria de uma requisição num único bulk_create."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_log_buffer():
+            return self.get_response(request)
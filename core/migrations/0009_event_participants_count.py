@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def preencher_contador(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    for event in Event.objects.annotate(total=Count('participants')):
+        Event.objects.filter(pk=event.pk).update(participants_count=event.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alter_event_event_type_auditlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(preencher_contador, migrations.RunPython.noop),
+    ]
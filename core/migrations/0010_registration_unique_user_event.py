@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:58
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remover_duplicadas(apps, schema_editor):
+    Registration = apps.get_model('core', 'Registration')
+    manter = (
+        Registration.objects.values('user', 'event')
+        .annotate(primeira=Min('id'))
+        .values_list('primeira', flat=True)
+    )
+    Registration.objects.exclude(id__in=list(manter)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_event_participants_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='registration',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_registration_user_event'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def mesclar_inscricoes(apps, schema_editor):
+    """
+    Copia para Registration as linhas da tabela automática de participants que
+    ainda não têm inscrição, apaga a tabela antiga e recalcula o contador.
+    """
+    Event = apps.get_model('core', 'Event')
+    Registration = apps.get_model('core', 'Registration')
+    Antiga = Event._meta.get_field('participants').remote_field.through
+
+    Registration.objects.bulk_create(
+        [
+            Registration(user_id=user_id, event_id=event_id)
+            for user_id, event_id in Antiga.objects.values_list('user_id', 'event_id').iterator()
+        ],
+        ignore_conflicts=True,
+    )
+    schema_editor.delete_model(Antiga)
+
+    total = (
+        Registration.objects.filter(event_id=OuterRef('pk'))
+        .order_by()
+        .values('event_id')
+        .annotate(c=Count('*'))
+        .values('c')
+    )
+    Event.objects.update(
+        participants_count=Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+    )
+
+
+def separar_inscricoes(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    Registration = apps.get_model('core', 'Registration')
+    Antiga = Event._meta.get_field('participants').remote_field.through
+
+    schema_editor.create_model(Antiga)
+    Antiga.objects.bulk_create(
+        Antiga(user_id=user_id, event_id=event_id)
+        for user_id, event_id in Registration.objects.values_list('user_id', 'event_id').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_registration_unique_user_event'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(mesclar_inscricoes, separar_inscricoes),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='event',
+                    name='participants',
+                    field=models.ManyToManyField(blank=True, related_name='events_participated', through='core.Registration', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['event', 'registered_at'], name='registration_event_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_registration_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='banner_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:18
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_event_banner_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='banner',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.banner_storage, upload_to='event_banners/'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Tabela FTS5 da busca de eventos (ver core/search.py). Só existe no SQLite;
+# nos outros bancos a busca usa icontains.
+CRIAR = """
+CREATE VIRTUAL TABLE IF NOT EXISTS core_event_fts USING fts5(
+    title, description, location,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+POPULAR = """
+INSERT INTO core_event_fts (rowid, title, description, location)
+SELECT id, title, description, location FROM core_event
+"""
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CRIAR)
+    schema_editor.execute(POPULAR)
+
+
+def apagar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS core_event_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_event_banner_content_hash_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, apagar_indice),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_type', 'start_date', 'id'], name='event_type_start_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'start_date', 'id'], name='event_organizer_start_idx'),
+        ),
+    ]
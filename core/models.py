@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .storage import banner_storage
 
 
 class User(AbstractUser):
@@ -41,14 +45,38 @@ class Event(models.Model):
     )
     participants = models.ManyToManyField(
         User,
+        through='Registration',
         related_name='events_participated',
         blank=True
     )
+    # Arquivos nomeados pelo hash do conteúdo; uploads iguais compartilham o arquivo
     banner = models.ImageField(
         upload_to='event_banners/',
+        storage=banner_storage,
         null=True,
         blank=True
     )
+    # Contador de vagas ocupadas. Só é alterado por UPDATEs condicionais
+    # (ver core/registrations.py), nunca pelo save() do formulário.
+    participants_count = models.PositiveIntegerField(default=0, editable=False)
+    # Versões redimensionadas do banner (ver core/images.py). Gravado só pelo
+    # processamento do banner, nunca pelo save() do formulário.
+    banner_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Última alteração do evento, inclusive inscrições e cancelamentos (que
+    # não passam pelo save()); base do ETag/Last-Modified das listagens
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Ordem e cursor da paginação por chave da API de eventos
+            models.Index(fields=['start_date', 'id'], name='event_start_date_id_idx'),
+            # Filtros da listagem (core.forms.EventFilterForm): igualdade
+            # primeiro, depois o intervalo/ordem de start_date
+            models.Index(fields=['event_type', 'start_date', 'id'], name='event_type_start_date_idx'),
+            models.Index(fields=['organizer', 'start_date', 'id'], name='event_organizer_start_idx'),
+            # MAX(updated_at) do GET condicional (core/conditional.py)
+            models.Index(fields=['updated_at'], name='event_updated_at_idx'),
+        ]
 
     def clean(self):
         """
@@ -64,16 +92,60 @@ class Event(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()  # garante validação sempre
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Evita sobrescrever o contador com um valor lido antes de
+            # inscrições concorrentes (e as variantes do banner, gravadas
+            # em segundo plano).
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('participants_count', 'banner_variants')
+            ]
         super().save(*args, **kwargs)
 
+    def banner_variant(self, tamanho):
+        """
+        URLs da variante `tamanho` do banner ({'webp', 'jpeg', 'width',
+        'height'}), ou None se o banner atual ainda não foi processado.
+        """
+        variants = self.banner_variants or {}
+        variante = variants.get(tamanho)
+        if not self.banner or not variante or variants.get('source') != self.banner.name:
+            return None
+        storage = self.banner.storage
+        return {
+            'webp': storage.url(variante['webp']),
+            'jpeg': storage.url(variante['jpeg']),
+            'width': variante['width'],
+            'height': variante['height'],
+        }
+
+    @property
+    def banner_thumb(self):
+        return self.banner_variant('thumb')
+
+    @property
+    def banner_medium(self):
+        return self.banner_variant('medium')
+
     def __str__(self):
         return self.title
 
 
 class Registration(models.Model):
+    """Tabela intermediária de Event.participants: uma inscrição, uma linha."""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     registered_at = models.DateTimeField(auto_now_add=True)
+    # Preenchido pelo comando send_event_reminders
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'event'], name='unique_registration_user_event'),
+        ]
+        indexes = [
+            models.Index(fields=['event', 'registered_at'], name='registration_event_idx'),
+        ]
 
 
 class Certificate(models.Model):
@@ -93,14 +165,68 @@ class AuditLog(models.Model):
         ('CREATE', 'Criação'),
         ('UPDATE', 'Atualização'),
         ('DELETE', 'Exclusão'),
+        ('READ', 'Leitura'),
     ]
 
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Sem constraint nem SET_NULL: o AuditLog pode estar em outro banco
+    # (core/routers.py). O log de um usuário excluído guarda o id dele; o
+    # índice (user, timestamp, id) abaixo já atende as buscas por usuário.
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, null=True, blank=True, db_constraint=False, db_index=False,
+    )
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     model = models.CharField(max_length=50)
     object_id = models.CharField(max_length=50)
     description = models.TextField()
+    # Campos alterados num UPDATE: {campo: [antes, depois]} (core/signals.py)
+    changes = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Ordem e cursor do visualizador de logs, do mais recente para o
+            # mais antigo; cada filtro tem seu índice com a mesma ordem
+            models.Index(fields=['timestamp', 'id'], name='auditlog_timestamp_id_idx'),
+            models.Index(fields=['model', 'timestamp', 'id'], name='auditlog_model_ts_idx'),
+            models.Index(fields=['action', 'timestamp', 'id'], name='auditlog_action_ts_idx'),
+            models.Index(fields=['user', 'timestamp', 'id'], name='auditlog_user_ts_idx'),
+        ]
+
     def __str__(self):
         return f"{self.model} - {self.action} - {self.timestamp}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Fila persistente de e-mails. As views só gravam aqui; o envio é feito
+    pelo comando `send_outbox` (ver core/outbox.py).
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendente'),
+        (SENT, 'Enviado'),
+        (FAILED, 'Falhou'),
+    ]
+
+    to = models.JSONField()
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['sent_at'], name='outbox_sent_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
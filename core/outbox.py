@@ -0,0 +1,135 @@
+"""
+Fila de e-mails (EmailOutbox).
+
+As views apenas gravam a mensagem na tabela com enfileirar_email(), dentro
+da mesma transação que a originou. O comando `send_outbox` chama
+enviar_lote(), que envia os e-mails vencidos por uma única conexão SMTP,
+reagenda as falhas com espera exponencial e respeita um limite de envios
+por minuto.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+# Tempo que um lote fica reservado para o worker que o pegou; se o worker
+# morrer no meio, as mensagens voltam para a fila depois disso.
+RESERVA = timedelta(minutes=5)
+# Maior espera entre duas tentativas da mesma mensagem
+ESPERA_MAXIMA = timedelta(hours=1)
+
+
+def enfileirar_email(subject, to, body='', html_body='', from_email=None):
+    """Grava a mensagem na fila. Não abre conexão com o servidor SMTP."""
+    return EmailOutbox.objects.create(
+        to=list(to),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+        html_body=html_body,
+    )
+
+
+def vagas_no_minuto(por_minuto):
+    """Quantas mensagens ainda podem sair no último minuto (None = sem limite)."""
+    if not por_minuto:
+        return None
+    enviados = EmailOutbox.objects.filter(sent_at__gte=timezone.now() - timedelta(minutes=1)).count()
+    return max(por_minuto - enviados, 0)
+
+
+def reservar_lote(limite):
+    """
+    Pega até `limite` mensagens vencidas e adia o next_attempt_at delas por
+    RESERVA, para que outro worker rodando ao mesmo tempo não as envie de novo.
+    """
+    agora = timezone.now()
+    vencidas = EmailOutbox.objects.filter(status=EmailOutbox.PENDING, next_attempt_at__lte=agora)
+    ids = list(vencidas.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:limite])
+    if not ids:
+        return []
+    prazo = agora + RESERVA
+    vencidas.filter(id__in=ids).update(next_attempt_at=prazo)
+    return list(EmailOutbox.objects.filter(id__in=ids, next_attempt_at=prazo).order_by('id'))
+
+
+def _mensagem(item, connection):
+    msg = EmailMultiAlternatives(item.subject, item.body, item.from_email, item.to, connection=connection)
+    if item.html_body:
+        msg.attach_alternative(item.html_body, "text/html")
+    return msg
+
+
+def _marcar_enviado(item):
+    EmailOutbox.objects.filter(pk=item.pk).update(
+        status=EmailOutbox.SENT,
+        sent_at=timezone.now(),
+        attempts=F('attempts') + 1,
+        last_error='',
+    )
+
+
+def _marcar_falha(item, erro):
+    """Reagenda com espera exponencial ou desiste após EMAIL_OUTBOX_MAX_ATTEMPTS."""
+    tentativas = item.attempts + 1
+    campos = {'attempts': tentativas, 'last_error': f"{type(erro).__name__}: {erro}"}
+    if tentativas >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        campos['status'] = EmailOutbox.FAILED
+    else:
+        espera = timedelta(seconds=settings.EMAIL_OUTBOX_BACKOFF * 2 ** (tentativas - 1))
+        campos['next_attempt_at'] = timezone.now() + min(espera, ESPERA_MAXIMA)
+    EmailOutbox.objects.filter(pk=item.pk).update(**campos)
+    return campos.get('status') == EmailOutbox.FAILED
+
+
+def enviar_lote(limite=None, por_minuto=None):
+    """
+    Envia um lote de mensagens vencidas por uma única conexão. Retorna um
+    dict com as contagens de enviadas, reagendadas e descartadas
+    (`limited` indica que o limite por minuto impediu o envio).
+    """
+    limite = limite or settings.EMAIL_OUTBOX_BATCH_SIZE
+    por_minuto = settings.EMAIL_OUTBOX_PER_MINUTE if por_minuto is None else por_minuto
+    resultado = {'sent': 0, 'retry': 0, 'failed': 0, 'limited': False}
+
+    vagas = vagas_no_minuto(por_minuto)
+    if vagas is not None:
+        if vagas == 0:
+            resultado['limited'] = True
+            return resultado
+        limite = min(limite, vagas)
+
+    itens = reservar_lote(limite)
+    if not itens:
+        return resultado
+
+    def falhou(item, erro):
+        resultado['failed' if _marcar_falha(item, erro) else 'retry'] += 1
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as erro:
+        # Servidor fora do ar: todo o lote volta para a fila
+        for item in itens:
+            falhou(item, erro)
+        return resultado
+
+    try:
+        for item in itens:
+            try:
+                _mensagem(item, connection).send()
+            except Exception as erro:
+                falhou(item, erro)
+                # A conexão pode ter caído; o próximo send() abre outra
+                connection.close()
+            else:
+                _marcar_enviado(item)
+                resultado['sent'] += 1
+    finally:
+        connection.close()
+    return resultado
@@ -0,0 +1,112 @@
+import base64
+from datetime import date
+
+from django.http import Http404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class EventKeysetPagination(BasePagination):
+    """
+    Paginação por chave (start_date, id) para a listagem de eventos.
+
+    Cada página começa onde a anterior terminou, usando o índice
+    (start_date, id), então não há COUNT(*) nem OFFSET: a página 1000 custa o
+    mesmo que a primeira.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            start_date, pk = cursor
+            queryset = queryset.filter(start_date__gte=start_date).exclude(
+                start_date=start_date, pk__lte=pk
+            )
+
+        page = list(queryset.order_by('start_date', 'id')[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if self.has_next else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            start_date, pk = raw.split('|')
+            return date.fromisoformat(start_date), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, event):
+        raw = f"{event.start_date.isoformat()}|{event.pk}"
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def pagina_por_timestamp(queryset, antes=None, depois=None, tamanho=20):
+    """
+    Página por chave (timestamp, id), da entrada mais recente para a mais
+    antiga, para o visualizador de logs.
+
+    `antes`/`depois` são o id da última/primeira entrada da página vista:
+    a nova página traz as entradas mais antigas/mais novas que ela. Sem
+    COUNT(*) nem OFFSET, a página um milhão custa o mesmo que a primeira.
+    Retorna (entradas, há_mais_novas, há_mais_antigas).
+    """
+    referencia = antes or depois
+    if referencia is not None:
+        try:
+            timestamp, pk = queryset.model.objects.values_list('timestamp', 'pk').get(pk=referencia)
+        except queryset.model.DoesNotExist:
+            raise Http404('Cursor inválido.')
+
+    if antes is not None:
+        queryset = queryset.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, pk__gte=pk)
+    elif depois is not None:
+        queryset = queryset.filter(timestamp__gte=timestamp).exclude(timestamp=timestamp, pk__lte=pk)
+        pagina = list(queryset.order_by('timestamp', 'id')[:tamanho + 1])
+        return pagina[:tamanho][::-1], len(pagina) > tamanho, True
+
+    pagina = list(queryset.order_by('-timestamp', '-id')[:tamanho + 1])
+    return pagina[:tamanho], antes is not None, len(pagina) > tamanho
@@ -0,0 +1,109 @@
+"""
+Renderização do PDF de certificado.
+
+Este módulo só depende do ReportLab e da biblioteca padrão para poder ser
+importado pelos processos do pool de core.certificates sem configurar o
+Django. Os dados chegam como dict simples (ver
+core.certificates.dados_certificado).
+"""
+import io
+import os
+from copy import copy
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Paragraph, Frame
+from reportlab.lib.styles import getSampleStyleSheet
+
+# Muda quando o desenho do certificado muda, invalidando os PDFs em cache
+VERSAO_MODELO = 2
+
+ROXO = colors.HexColor("#43054E")
+WIDTH, HEIGHT = A4
+
+
+@lru_cache(maxsize=None)
+def _estilo_texto():
+    # getSampleStyleSheet() monta dezenas de estilos; fazemos isso uma vez por processo
+    style = copy(getSampleStyleSheet()['Normal'])
+    style.alignment = 1
+    style.fontName = 'Helvetica'
+    style.fontSize = 14
+    style.leading = 22
+    return style
+
+
+@lru_cache(maxsize=8)
+def _logo(logo_path):
+    """Logo lido e decodificado uma vez por processo (None se não existir)."""
+    if not logo_path or not os.path.exists(logo_path):
+        return None
+    return ImageReader(logo_path)
+
+
+def _desenhar_moldura(c, logo_path):
+    """Fundo, borda, logo, título e linha de assinatura: iguais em todo certificado."""
+    c.setFillColorRGB(1, 1, 1)
+    c.rect(0, 0, WIDTH, HEIGHT, fill=1)
+
+    c.setStrokeColor(ROXO)
+    c.setLineWidth(4)
+    c.rect(2*cm, 2*cm, WIDTH - 4*cm, HEIGHT - 4*cm, stroke=1, fill=0)
+
+    logo = _logo(logo_path)
+    if logo is not None:
+        c.drawImage(logo, x=WIDTH/2 - 2*cm, y=HEIGHT - 6*cm,
+                    width=4*cm, height=4*cm, preserveAspectRatio=True, mask='auto')
+
+    c.setFont("Helvetica-Bold", 26)
+    c.setFillColor(ROXO)
+    c.drawCentredString(WIDTH/2, HEIGHT - 7.5*cm, "Certificado de Participação")
+
+    c.setFont("Helvetica", 12)
+    c.drawString(WIDTH - 9*cm, 3.1*cm, "________________________")
+    c.drawString(WIDTH - 8.8*cm, 2.5*cm, "Assinatura do Organizador")
+
+
+def gerar_certificado_pdf(dados, destino=None):
+    """
+    Desenha o certificado. Escreve em `destino` (arquivo ou resposta HTTP) ou,
+    se omitido, devolve os bytes do PDF.
+    """
+    saida = destino if destino is not None else io.BytesIO()
+
+    c = canvas.Canvas(saida, pagesize=A4, pageCompression=1)
+    _desenhar_moldura(c, dados.get('logo_path'))
+
+    text = f"""
+    Certificamos que <b>{escape(dados['nome'])}</b> participou do evento
+    <b>{escape(dados['evento'])}</b>, realizado de {dados['inicio']}
+    a {dados['fim']}, no local {escape(dados['local'])}.
+    """
+    para = Paragraph(text, _estilo_texto())
+    frame = Frame(3*cm, HEIGHT/2 - 3*cm, WIDTH - 6*cm, 6*cm, showBoundary=0)
+    frame.addFromList([para], c)
+
+    c.setFont("Helvetica-Oblique", 12)
+    c.setFillColor(ROXO)
+    c.drawCentredString(WIDTH/2, 4*cm, f"Emitido em {dados['emitido_em']}")
+
+    c.showPage()
+    c.save()
+    if destino is None:
+        return saida.getvalue()
+
+
+def renderizar_certificado(dados):
+    """
+    Versão para o pool de processos: devolve (dados, pdf, erro) em vez de
+    levantar exceção, para que uma falha não interrompa o lote.
+    """
+    try:
+        return dados, gerar_certificado_pdf(dados), None
+    except Exception as erro:
+        return dados, None, f"{type(erro).__name__}: {erro}"
@@ -0,0 +1,117 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidar_evento
+from .models import Event, Registration
+from .utils import registrar_log
+
+# Resultados possíveis de uma tentativa de inscrição
+INSCRITO = 'registered'
+LOTADO = 'full'
+JA_INSCRITO = 'already_registered'
+ORGANIZADOR = 'organizer'
+
+
+def reservar_vaga(event, user):
+    """
+    Inscreve `user` em `event` sem ultrapassar `max_participants`.
+
+    A vaga é reservada por um único UPDATE condicional no contador do evento;
+    se nenhuma linha for afetada o evento está lotado e nada mais é escrito
+    (a não ser que `user` já esteja inscrito: aí o resultado é JA_INSCRITO).
+    Não há COUNT na tabela de participantes.
+    """
+    try:
+        with transaction.atomic():
+            claimed = Event.objects.filter(
+                pk=event.pk,
+                participants_count__lt=F('max_participants'),
+            ).update(participants_count=F('participants_count') + 1, updated_at=timezone.now())
+            if not claimed:
+                # Evento cheio: quem já está nele não recebe "lotado"
+                if Registration.objects.filter(event=event, user=user).exists():
+                    return JA_INSCRITO
+                return LOTADO
+            # INSERT direto na tabela de participants: o contador já foi
+            # ajustado acima, então o m2m_changed não deve disparar.
+            Registration.objects.create(event=event, user=user)
+    except IntegrityError:
+        # (event, user) já existe; o atomic desfez o incremento.
+        return JA_INSCRITO
+
+    # UPDATE direto no contador: os signals de Event não disparam
+    invalidar_evento(event.pk)
+    registrar_log(
+        user=user,
+        action="CREATE",
+        model="Registration",
+        object_id=f"{user.id}-{event.id}",
+        description=f"Usuário {user.username} inscrito no evento {event.title}"
+    )
+    return INSCRITO
+
+
+def cancelar_inscricao(event, user):
+    """Remove a inscrição e devolve a vaga. Retorna False se não havia inscrição."""
+    with transaction.atomic():
+        deleted, _ = Registration.objects.filter(event=event, user=user).delete()
+        if not deleted:
+            return False
+        Event.objects.filter(pk=event.pk, participants_count__gt=0).update(
+            participants_count=F('participants_count') - 1, updated_at=timezone.now()
+        )
+    invalidar_evento(event.pk)
+
+    registrar_log(
+        user=user,
+        action="DELETE",
+        model="Registration",
+        object_id=f"{user.id}-{event.id}",
+        description=f"Usuário {user.username} cancelou inscrição no evento {event.title}"
+    )
+    return True
+
+
+def inscrever_em_lote(event, user_ids):
+    """
+    Inscreve de uma vez os usuários `user_ids` (distintos, na ordem dada)
+    em `event`.
+
+    As vagas são conferidas uma única vez para o lote: entram os primeiros
+    que couberem em `max_participants`, os demais ficam como LOTADO. As
+    inscrições são criadas com um bulk_create e o contador é ajustado com um
+    único UPDATE, tudo na mesma transação. Retorna {user_id: resultado}.
+    """
+    resultados = {}
+    with transaction.atomic():
+        # A transação já começa com a trava de escrita (IMMEDIATE), então
+        # nenhuma inscrição concorrente muda o contador até o commit
+        ocupadas, limite = (
+            Event.objects.select_for_update()
+            .values_list('participants_count', 'max_participants').get(pk=event.pk)
+        )
+        # No máximo max_participants linhas, lidas do índice (event, user)
+        existentes = set(Registration.objects.filter(event=event).values_list('user_id', flat=True))
+        vagas = max(limite - ocupadas, 0)
+        novos = []
+        for user_id in user_ids:
+            if user_id == event.organizer_id:
+                resultados[user_id] = ORGANIZADOR
+            elif user_id in existentes:
+                resultados[user_id] = JA_INSCRITO
+            elif len(novos) < vagas:
+                novos.append(user_id)
+                resultados[user_id] = INSCRITO
+            else:
+                resultados[user_id] = LOTADO
+
+        if novos:
+            # INSERT direto na tabela de participants: o m2m_changed não
+            # dispara, o contador é ajustado aqui
+            Registration.objects.bulk_create([Registration(event=event, user_id=user_id) for user_id in novos])
+            Event.objects.filter(pk=event.pk).update(
+                participants_count=F('participants_count') + len(novos), updated_at=timezone.now()
+            )
+            invalidar_evento(event.pk)
+    return resultados
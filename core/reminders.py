@@ -0,0 +1,106 @@
+"""
+Lembretes por e-mail para os participantes de eventos que vão começar.
+
+O template é renderizado uma vez por evento, com um marcador no lugar do
+nome; cada mensagem só troca o marcador. Os participantes são lidos em
+pedaços com .iterator() e enviados com send_messages() por uma única
+conexão. Registration.reminder_sent_at marca quem já recebeu, então rodar
+o comando de novo não repete envios.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import Event, Registration
+
+MARCADOR_NOME = '%%NOME%%'
+
+
+def eventos_na_janela(janela, agora=None):
+    """Eventos que começam entre agora e agora + janela."""
+    agora = agora or timezone.now()
+    limite = agora + janela
+    candidatos = Event.objects.filter(
+        start_date__gte=timezone.localdate(agora),
+        start_date__lte=timezone.localdate(limite),
+    ).order_by('start_date', 'start_time', 'id')
+    for event in candidatos:
+        inicio = timezone.make_aware(datetime.combine(event.start_date, event.start_time))
+        if agora <= inicio <= limite:
+            yield event
+
+
+def modelo_do_evento(event):
+    """(assunto, texto, html) do lembrete, com MARCADOR_NOME no lugar do nome."""
+    context = {
+        'event': event,
+        'nome': MARCADOR_NOME,
+        'link': settings.BASE_URL + reverse('core:event_detail', args=[event.id]),
+    }
+    subject = f"Lembrete: {event.title}"
+    html = render_to_string('core/reminder_email.html', context)
+    texto = (
+        f"Olá, {MARCADOR_NOME}!\n\n"
+        f"O evento {event.title} começa em {event.start_date:%d/%m/%Y} às {event.start_time:%H:%M}, "
+        f"no local {event.location}.\n\n{context['link']}\n"
+    )
+    return subject, texto, html
+
+
+def _em_pedacos(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while pedaco := list(islice(iterador, tamanho)):
+        yield pedaco
+
+
+def enviar_lembretes_evento(event, connection, tamanho_lote=500):
+    """Envia os lembretes pendentes de um evento. Retorna quantos foram enviados."""
+    subject, texto, html = modelo_do_evento(event)
+    pendentes = (
+        Registration.objects.filter(event=event, reminder_sent_at__isnull=True)
+        .exclude(user__email='')
+        .order_by('id')
+        .values_list('id', 'user__email', 'user__first_name', 'user__username')
+        .iterator(chunk_size=tamanho_lote)
+    )
+
+    enviados = 0
+    for pedaco in _em_pedacos(pendentes, tamanho_lote):
+        mensagens = []
+        for _, email, first_name, username in pedaco:
+            nome = first_name or username
+            msg = EmailMultiAlternatives(
+                subject, texto.replace(MARCADOR_NOME, nome),
+                settings.DEFAULT_FROM_EMAIL, [email], connection=connection,
+            )
+            msg.attach_alternative(html.replace(MARCADOR_NOME, escape(nome)), "text/html")
+            mensagens.append(msg)
+        connection.send_messages(mensagens)
+        # Só marca depois que o pedaço saiu; se o envio falhar, a próxima
+        # execução retoma deste ponto.
+        Registration.objects.filter(id__in=[linha[0] for linha in pedaco]).update(
+            reminder_sent_at=timezone.now()
+        )
+        enviados += len(pedaco)
+    return enviados
+
+
+def enviar_lembretes(janela=None, tamanho_lote=500, agora=None):
+    """Envia os lembretes de todos os eventos da janela. Retorna {evento: enviados}."""
+    if janela is None:
+        janela = timedelta(hours=settings.EVENT_REMINDER_WINDOW_HOURS)
+    resultado = {}
+    connection = get_connection()
+    connection.open()
+    try:
+        for event in eventos_na_janela(janela, agora):
+            resultado[event] = enviar_lembretes_evento(event, connection, tamanho_lote)
+    finally:
+        connection.close()
+    return resultado
@@ -0,0 +1,45 @@
+"""
+Roteamento do AuditLog para um banco próprio.
+
+Com AUDIT_DB_SEPARATE ativo existe o alias 'audit' em DATABASES e o AuditLog
+é lido, gravado e migrado só nele; os demais modelos ficam no banco
+principal. Sem o alias o roteador não interfere.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+AUDIT_DB = 'audit'
+
+
+def _separado():
+    return AUDIT_DB in settings.DATABASES
+
+
+def _auditoria(model):
+    # Aceita o modelo ou uma instância (inclusive o request.user preguiçoso)
+    return model._meta.label == 'core.AuditLog'
+
+
+class AuditRouter:
+    def db_for_read(self, model, **hints):
+        if not _separado():
+            return None
+        # Os demais modelos vão sempre para o principal, inclusive quando
+        # a consulta parte de um AuditLog (log.user, prefetch_related)
+        return AUDIT_DB if _auditoria(model) else DEFAULT_DB_ALIAS
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A FK AuditLog.user atravessa os dois bancos (sem constraint)
+        if _auditoria(obj1) or _auditoria(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not _separado():
+            return None
+        eh_auditoria = app_label == 'core' and model_name == 'auditlog'
+        if db == AUDIT_DB:
+            return eh_auditoria
+        return False if eh_auditoria else None
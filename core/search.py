@@ -0,0 +1,126 @@
+"""
+Busca textual de eventos (título, descrição e local).
+
+No SQLite usa a tabela virtual FTS5 core_event_fts (criada na migração
+0017), com rowid = Event.id, tokenizador unicode61 sem acentos ("educacao"
+encontra "Educação") e índices de prefixo. A tabela guarda sua própria cópia
+do texto e é mantida pelos signals de Event (core/signals.py); o comando
+rebuild_search_index a reconstrói do zero. Em outros bancos a busca cai num
+icontains simples.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Event
+
+TABELA = 'core_event_fts'
+CAMPOS = ('title', 'description', 'location')
+# Pesos do bm25 na ordem de CAMPOS: o título pesa mais que o local, que pesa
+# mais que a descrição
+PESOS = (10.0, 1.0, 3.0)
+
+_PALAVRA = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_disponivel():
+    return connection.vendor == 'sqlite'
+
+
+def montar_consulta(texto):
+    """
+    Converte o texto digitado numa consulta FTS5: todas as palavras precisam
+    aparecer e cada uma vale como prefixo ("semin ia" encontra "Seminário
+    de IA"). Aspas evitam que palavras como AND/NOT virem operadores.
+    """
+    palavras = _PALAVRA.findall(texto or '')
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def buscar_ids(texto, limite=20, offset=0, queryset=None):
+    """
+    Ids dos eventos que casam com `texto`, do mais para o menos relevante.
+    Com `queryset`, só entram os eventos dele (filtros aplicados antes do
+    LIMIT, para não perder resultados).
+    """
+    consulta = montar_consulta(texto)
+    queryset = Event.objects.all() if queryset is None else queryset
+    # queryset.none() (ex.: filtros inválidos) não vira SQL
+    if not consulta or queryset.query.is_empty():
+        return []
+    if not fts_disponivel():
+        filtro = Q()
+        for palavra in _PALAVRA.findall(texto):
+            filtro &= Q(title__icontains=palavra) | Q(description__icontains=palavra) | Q(location__icontains=palavra)
+        return list(queryset.filter(filtro).order_by('start_date', 'id').values_list('id', flat=True)[offset:offset + limite])
+
+    restricao, params = '', []
+    if queryset.query.where:
+        sql, params = queryset.order_by().values_list('id').query.sql_with_params()
+        restricao = f" AND rowid IN ({sql})"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {TABELA} WHERE {TABELA} MATCH %s{restricao} "
+            f"ORDER BY bm25({TABELA}, {', '.join(map(str, PESOS))}) LIMIT %s OFFSET %s",
+            [consulta, *params, limite, offset],
+        )
+        return [linha[0] for linha in cursor.fetchall()]
+
+
+def buscar_eventos(texto, queryset=None, limite=20, offset=0):
+    """Eventos de `queryset` que casam com `texto`, na ordem de relevância."""
+    queryset = Event.objects.all() if queryset is None else queryset
+    ids = buscar_ids(texto, limite, offset, queryset)
+    if not ids:
+        return queryset.none()
+    ordem = Case(*[When(pk=pk, then=Value(posicao)) for posicao, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(ordem)
+
+
+# ---------------- Manutenção do índice ----------------
+
+def indexar_evento(event):
+    if not fts_disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA} WHERE rowid = %s", [event.pk])
+        cursor.execute(
+            f"INSERT INTO {TABELA} (rowid, {', '.join(CAMPOS)}) VALUES (%s, %s, %s, %s)",
+            [event.pk] + [getattr(event, campo) for campo in CAMPOS],
+        )
+
+
+def remover_evento(event_id):
+    if not fts_disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA} WHERE rowid = %s", [event_id])
+
+
+def indexar_em_massa(queryset=None):
+    """
+    (Re)indexa os eventos de `queryset` (todos, se omitido) com um único
+    INSERT ... SELECT. Usado após bulk_create, que não dispara signals.
+    """
+    if not fts_disponivel():
+        return
+    queryset = Event.objects.all() if queryset is None else queryset
+    sql, params = queryset.order_by().values_list('id', *CAMPOS).query.sql_with_params()
+    with connection.cursor() as cursor:
+        if queryset.query.where:
+            ids_sql, ids_params = queryset.order_by().values_list('id').query.sql_with_params()
+            cursor.execute(f"DELETE FROM {TABELA} WHERE rowid IN ({ids_sql})", ids_params)
+        else:
+            cursor.execute(f"DELETE FROM {TABELA}")
+        cursor.execute(f"INSERT INTO {TABELA} (rowid, {', '.join(CAMPOS)}) {sql}", params)
+
+
+def reconstruir_indice():
+    """Apaga e refaz o índice inteiro e o compacta. Retorna quantos eventos foram indexados."""
+    if not fts_disponivel():
+        return 0
+    indexar_em_massa()
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABELA} ({TABELA}) VALUES ('optimize')")
+    return Event.objects.count()
@@ -1,5 +1,7 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Event
+from .images import VARIANTES
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -16,17 +18,94 @@ class UserSerializer(serializers.ModelSerializer):
 # Serializer para listar eventos
 # -----------------------------
 class EventSerializer(serializers.ModelSerializer):
-    organizer = UserSerializer(read_only=True)
-    participants = UserSerializer(many=True, read_only=True)
+    """
+    Evento com os campos e relações escolhidos pelo cliente.
+
+    Lê do contexto `fields` (campos a devolver; vazio = DEFAULT_FIELDS) e
+    `expand` ('organizer' troca o id pelo usuário completo, 'participants'
+    inclui a lista de inscritos). `prepare_queryset` ajusta a consulta ao
+    mesmo recorte.
+    """
+    DEFAULT_FIELDS = [
+        'id', 'title', 'event_type',
+        'start_date', 'end_date', 'start_time', 'end_time',
+        'location', 'max_participants', 'participants_count', 'banner',
+        'banner_variants', 'organizer'
+    ]
+    EXPANDABLE = ('organizer', 'participants')
+
+    banner_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'description', 'event_type',
             'start_date', 'end_date', 'start_time', 'end_time',
-            'location', 'max_participants', 'banner',
-            'organizer', 'participants'
+            'location', 'max_participants', 'banner', 'banner_variants',
+            'organizer', 'participants', 'participants_count'
         ]
+        read_only_fields = fields
+
+    def get_banner_variants(self, obj):
+        """URLs absolutas das versões redimensionadas do banner, por tamanho."""
+        request = self.context.get('request')
+        variants = {}
+        for tamanho in VARIANTES:
+            variante = obj.banner_variant(tamanho)
+            if variante is None:
+                continue
+            if request is not None:
+                for formato in ('webp', 'jpeg'):
+                    variante[formato] = request.build_absolute_uri(variante[formato])
+            variants[tamanho] = variante
+        return variants
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get('expand', ())
+        if 'organizer' in expand:
+            fields['organizer'] = UserSerializer(read_only=True)
+        if 'participants' in expand:
+            fields['participants'] = UserSerializer(many=True, read_only=True)
+        wanted = set(self.context.get('fields') or self.DEFAULT_FIELDS) | set(expand)
+        return {name: field for name, field in fields.items() if name in wanted}
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields=None, expand=()):
+        """Carrega só as colunas e relações que o serializer vai usar."""
+        wanted = set(fields or cls.DEFAULT_FIELDS) | set(expand)
+        # id e start_date são sempre necessários para a paginação por chave
+        columns = {'id', 'start_date'} | (wanted - {'participants'})
+        if 'banner_variants' in wanted:
+            columns.add('banner')
+
+        if 'organizer' in expand:
+            queryset = queryset.select_related('organizer')
+            columns |= {f'organizer__{name}' for name in UserSerializer.Meta.fields}
+        if 'participants' in wanted:
+            user_columns = UserSerializer.Meta.fields if 'participants' in expand else ['id']
+            queryset = queryset.prefetch_related(
+                Prefetch('participants', queryset=User.objects.only(*user_columns))
+            )
+        return queryset.only(*columns)
+
+
+def event_fields_context(request):
+    """Interpreta ?fields= e ?expand= para o EventSerializer."""
+    def split(name):
+        return [item.strip() for item in request.query_params.get(name, '').split(',') if item.strip()]
+
+    fields, expand = split('fields'), split('expand')
+    unknown_fields = set(fields) - set(EventSerializer.Meta.fields)
+    unknown_expand = set(expand) - set(EventSerializer.EXPANDABLE)
+    errors = {}
+    if unknown_fields:
+        errors['fields'] = f"Campos desconhecidos: {', '.join(sorted(unknown_fields))}."
+    if unknown_expand:
+        errors['expand'] = f"Expansões desconhecidas: {', '.join(sorted(unknown_expand))}."
+    if errors:
+        raise serializers.ValidationError(errors)
+    return {'fields': fields, 'expand': set(expand)}
 
 # -----------------------------
 # Serializer para criar eventos via API
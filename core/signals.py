@@ -1,15 +1,112 @@
-from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
+from django.db.models import F
 from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.utils import timezone
 from .utils import registrar_log
 from .models import Event, Registration
+from .images import agendar_processamento, liberar_banner, remover_variantes
+from .search import CAMPOS as CAMPOS_BUSCA, indexar_evento, remover_evento
+from .cache import invalidar_evento, invalidar_eventos
+from .conditional import CAMPOS_USUARIO_EXIBIDOS, renovar_eventos_do_usuario
 
 User = get_user_model()
 
-# Log quando usuário é criado
+# ---------------- Banner ----------------
+# Antes da auditoria: o nome anterior do banner vem de _estado_auditado, que
+# auditar_evento renova ao final do save
+@receiver(post_save, sender=Event)
+def processar_banner_alterado(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'banner' not in update_fields:
+        return
+    anterior = instance.__dict__.get('_estado_auditado', {}).get('banner')
+    if not created and anterior and anterior != instance.banner.name:
+        # O arquivo antigo pode estar em uso por outro evento
+        transaction.on_commit(lambda: liberar_banner(anterior))
+
+    variants = instance.banner_variants or {}
+    if instance.banner.name != variants.get('source') and (instance.banner or variants):
+        # Depois do commit, para a thread enxergar o banner novo
+        transaction.on_commit(lambda: agendar_processamento(instance.pk))
+
+@receiver(post_delete, sender=Event)
+def liberar_banner_apagado(sender, instance, **kwargs):
+    nome, variants = instance.banner.name, instance.banner_variants
+    def liberar():
+        liberar_banner(nome)
+        if variants:
+            remover_variantes(variants)
+    transaction.on_commit(liberar)
+
+# ---------------- Auditoria ----------------
+# Campos de controle: um save que só mexe neles (o last_login gravado a cada
+# login, o contador de vagas, as variantes do banner) não gera log
+CAMPOS_CONTROLE = {
+    User: {'last_login'},
+    Event: {'participants_count', 'banner_variants', 'updated_at'},
+}
+# Entram no diff só como alterados, sem os valores
+CAMPOS_SIGILOSOS = {'password'}
+
+
+def _campos_auditados(model):
+    controle = CAMPOS_CONTROLE[model]
+    return tuple(
+        (field.name, field.attname, isinstance(field, models.FileField))
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in controle
+    )
+
+
+# (nome, attname, é arquivo) de cada campo auditado, calculado uma vez: o
+# post_init roda a cada instância carregada
+CAMPOS_AUDITADOS = {model: _campos_auditados(model) for model in CAMPOS_CONTROLE}
+
+
+def _estado(instance):
+    """{campo: valor} dos campos auditados já carregados (sem disparar queries)."""
+    dados = instance.__dict__
+    estado = {}
+    for nome, attname, arquivo in CAMPOS_AUDITADOS[type(instance)]:
+        if attname in dados:
+            valor = dados[attname]
+            # FieldFile do banner: interessa só o nome
+            estado[nome] = getattr(valor, 'name', valor) if arquivo else valor
+    return estado
+
+
+def _alteracoes(instance, update_fields):
+    """Diff {campo: [antes, depois]} desde o último carregamento ou save."""
+    anterior = instance.__dict__.get('_estado_auditado', {})
+    atual = _estado(instance)
+    campos = atual.keys() if update_fields is None else atual.keys() & set(update_fields)
+    alteracoes = {}
+    for campo in sorted(campos):
+        # Campo adiado no carregamento: o valor anterior é desconhecido
+        antes = anterior.get(campo)
+        if campo in anterior and antes == atual[campo]:
+            continue
+        alteracoes[campo] = ['***', '***'] if campo in CAMPOS_SIGILOSOS else [antes, atual[campo]]
+    instance._estado_auditado = {**anterior, **atual}
+    return alteracoes
+
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=Event)
+def guardar_estado_auditado(sender, instance, **kwargs):
+    # Também é o estado de referência do banner (ver processar_banner_alterado)
+    instance._estado_auditado = _estado(instance)
+
+
+def _somente_controle(sender, update_fields):
+    return update_fields is not None and set(update_fields) <= CAMPOS_CONTROLE[sender]
+
+
 @receiver(post_save, sender=User)
-def log_criacao_usuario(sender, instance, created, **kwargs):
+def auditar_usuario(sender, instance, created, update_fields=None, **kwargs):
     if created:
+        instance._estado_auditado = _estado(instance)
         registrar_log(
             user=instance,
             action="CREATE",
@@ -17,23 +114,28 @@ def log_criacao_usuario(sender, instance, created, **kwargs):
             object_id=instance.id,
             description=f"Usuário criado: {instance.email}"
         )
-
-# Log quando usuário é atualizado
-@receiver(post_save, sender=User)
-def log_update_usuario(sender, instance, created, **kwargs):
-    if not created:
+        return
+    if _somente_controle(sender, update_fields):
+        return
+    alteracoes = _alteracoes(instance, update_fields)
+    # Nome e e-mail aparecem nos eventos: o ETag deles precisa mudar
+    if alteracoes.keys() & CAMPOS_USUARIO_EXIBIDOS:
+        renovar_eventos_do_usuario(instance.pk)
+    if alteracoes:
         registrar_log(
             user=instance,
             action="UPDATE",
             model="User",
             object_id=instance.id,
-            description=f"Usuário atualizado: {instance.email}"
+            description=f"Usuário atualizado: {instance.email} ({', '.join(alteracoes)})",
+            changes=alteracoes,
         )
 
-# Log quando evento é criado
+
 @receiver(post_save, sender=Event)
-def log_evento_criado(sender, instance, created, **kwargs):
+def auditar_evento(sender, instance, created, update_fields=None, **kwargs):
     if created:
+        instance._estado_auditado = _estado(instance)
         registrar_log(
             user=None,
             action="CREATE",
@@ -41,17 +143,18 @@ def log_evento_criado(sender, instance, created, **kwargs):
             object_id=instance.id,
             description=f"Evento criado: {instance.title}"
         )
-
-# Log quando evento é atualizado
-@receiver(post_save, sender=Event)
-def log_evento_atualizado(sender, instance, created, **kwargs):
-    if not created:
+        return
+    if _somente_controle(sender, update_fields):
+        return
+    alteracoes = _alteracoes(instance, update_fields)
+    if alteracoes:
         registrar_log(
             user=None,
             action="UPDATE",
             model="Event",
             object_id=instance.id,
-            description=f"Evento atualizado: {instance.title}"
+            description=f"Evento atualizado: {instance.title} ({', '.join(alteracoes)})",
+            changes=alteracoes,
         )
 
 # Log quando evento é apagado
@@ -65,34 +168,103 @@ def log_evento_apagado(sender, instance, **kwargs):
         description=f"Evento apagado: {instance.title}"
     )
 
+# ---------------- Busca ----------------
+# Na mesma transação do save/delete: se ele for desfeito, o índice também é
+@receiver(post_save, sender=Event)
+def indexar_evento_salvo(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & set(CAMPOS_BUSCA):
+        indexar_evento(instance)
 
+@receiver(post_delete, sender=Event)
+def remover_evento_do_indice(sender, instance, **kwargs):
+    remover_evento(instance.pk)
 
-User = get_user_model()
+# ---------------- Cache ----------------
+# Só o card deste evento (e as páginas da listagem) deixa de valer
+@receiver([post_save, post_delete], sender=Event)
+def invalidar_cache_evento(sender, instance, **kwargs):
+    invalidar_evento(instance.pk)
 
 @receiver(m2m_changed, sender=Event.participants.through)
-def sync_registration(sender, instance, action, pk_set, **kwargs):
-    if action not in ["post_add", "post_remove"]:
+def sync_registration(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Registration é a própria tabela de participants, então aqui só restam o
+    contador de vagas e a auditoria, com um número fixo de queries por
+    operação independente de quantos participantes entram ou saem de uma vez.
+    """
+    # No post_add o Django já filtra os ids existentes, mas no remove/clear
+    # é preciso descobrir antes da exclusão quais linhas realmente existem.
+    if action in ("pre_remove", "pre_clear"):
+        outro_lado = 'event_id' if reverse else 'user_id'
+        filtro = {'user_id' if reverse else 'event_id': instance.pk}
+        if action == "pre_remove":
+            filtro[f'{outro_lado}__in'] = pk_set
+        instance._participantes_removidos = set(
+            sender.objects.filter(**filtro).values_list(outro_lado, flat=True)
+        )
+        return
+
+    if action == "post_add":
+        ids, inscricao = pk_set, True
+    elif action in ("post_remove", "post_clear"):
+        ids, inscricao = instance.__dict__.pop('_participantes_removidos', set()), False
+    else:
         return
+    if not ids:
+        return
+
+    if reverse:
+        pares = [(instance, event) for event in Event.objects.filter(pk__in=ids).only('id', 'title')]
+    else:
+        pares = [(user, instance) for user in User.objects.filter(pk__in=ids).only('id', 'username')]
+
+    _ajustar_contador(instance, reverse, ids, 1 if inscricao else -1)
+    invalidar_eventos(ids if reverse else [instance.pk])
 
-    for user_id in pk_set:
-        user = User.objects.get(id=user_id)
-        if action == "post_add":
-            
-            Registration.objects.get_or_create(user=user, event=instance)
+    for user, event in pares:
+        if inscricao:
             registrar_log(
                 user=user,
                 action="CREATE",
                 model="Registration",
-                object_id=f"{user.id}-{instance.id}",
-                description=f"Usuário {user.username} inscrito no evento {instance.title}"
+                object_id=f"{user.id}-{event.id}",
+                description=f"Usuário {user.username} inscrito no evento {event.title}"
             )
-        elif action == "post_remove":
-           
-            Registration.objects.filter(user=user, event=instance).delete()
+        else:
             registrar_log(
                 user=user,
                 action="DELETE",
                 model="Registration",
-                object_id=f"{user.id}-{instance.id}",
-                description=f"Usuário {user.username} cancelou inscrição no evento {instance.title}"
+                object_id=f"{user.id}-{event.id}",
+                description=f"Usuário {user.username} cancelou inscrição no evento {event.title}"
             )
+
+
+def _ajustar_contador(instance, reverse, ids, sinal):
+    """Aplica +1/-1 em participants_count (e renova updated_at) com um único UPDATE."""
+    if not ids:
+        return
+    if reverse:
+        # instance é um usuário; cada evento em `ids` ganha/perde uma vaga
+        Event.objects.filter(pk__in=ids).update(
+            participants_count=F('participants_count') + sinal, updated_at=timezone.now()
+        )
+    else:
+        Event.objects.filter(pk=instance.pk).update(
+            participants_count=F('participants_count') + sinal * len(ids), updated_at=timezone.now()
+        )
+
+
+@receiver(pre_delete, sender=User)
+def liberar_vagas_do_usuario(sender, instance, **kwargs):
+    """
+    Excluir um usuário apaga as inscrições dele em cascata, sem m2m_changed:
+    as vagas são devolvidas aqui, na mesma transação do DELETE.
+    """
+    ids = list(Registration.objects.filter(user=instance).values_list('event_id', flat=True))
+    if not ids:
+        return
+    Event.objects.filter(pk__in=ids, participants_count__gt=0).update(
+        participants_count=F('participants_count') - 1, updated_at=timezone.now()
+    )
+    invalidar_eventos(ids)
@@ -0,0 +1,63 @@
+"""
+Armazenamento dos banners por conteúdo.
+
+O nome do arquivo é o hash do conteúdo, então o mesmo upload feito várias
+vezes ocupa um único arquivo (e a URL não muda, o que ajuda o cache do
+navegador). Como um arquivo pode ser usado por vários eventos, ele só é
+apagado quando nenhum evento o referencia mais (ver core.images.liberar_banner).
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+
+# 128 bits do SHA-256 bastam para não haver colisão entre banners
+TAMANHO_HASH = 32
+
+
+def hash_conteudo(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()[:TAMANHO_HASH]
+
+
+class ContentHashStorage(FileSystemStorage):
+    """FileSystemStorage que grava cada arquivo como <pasta>/<hash>.<extensão>."""
+
+    def nome_por_conteudo(self, name, content):
+        extensao = os.path.splitext(name)[1].lower()
+        return posixpath.join(posixpath.dirname(name), hash_conteudo(content) + extensao)
+
+    def get_available_name(self, name, max_length=None):
+        # Nunca acrescenta sufixo: o nome é o hash do conteúdo, então um
+        # arquivo com esse nome já tem o mesmo conteúdo. Também é chamado
+        # pelo _save quando outro upload criou o arquivo depois da checagem.
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.nome_por_conteudo(name, content)
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            # Mesmo conteúdo já armazenado: reaproveita o arquivo
+            return name
+
+
+_banner_storage = ContentHashStorage()
+
+
+def banner_storage():
+    return _banner_storage
@@ -0,0 +1,92 @@
+import io
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import archive
+from core.models import AuditLog, User
+
+CAMPOS = ('id', 'timestamp', 'user_id', 'action', 'model', 'object_id', 'description', 'changes')
+
+
+class ArquivamentoTests(TestCase):
+    """Arquivar e restaurar os logs de auditoria sem perder nem repetir entradas."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.pasta = pasta.name
+        arquivo = override_settings(AUDIT_ARCHIVE_DIR=self.pasta, AUDIT_LOG_RETENTION_DAYS=30)
+        arquivo.enable()
+        self.addCleanup(arquivo.disable)
+
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        self.dia = timezone.localdate() - timedelta(days=200)
+        self.antigos = []
+        for i in range(5):
+            log = AuditLog.objects.create(
+                user=organizador, action='UPDATE', model='Event', object_id=str(i),
+                description=f'Evento atualizado: {i}', changes={'title': [f'Antes {i}', f'Depois {i}']},
+            )
+            horario = timezone.make_aware(datetime.combine(self.dia, time(10, i, 15, 123456)))
+            AuditLog.objects.filter(pk=log.pk).update(timestamp=horario)
+            self.antigos.append(log.pk)
+        self.recente = AuditLog.objects.create(
+            user=organizador, action='CREATE', model='Event', object_id='9', description='Evento criado',
+        ).pk
+        self.originais = list(AuditLog.objects.filter(pk__in=self.antigos).order_by('id').values_list(*CAMPOS))
+
+    def _particao(self):
+        return list(archive._ler_particao(self.dia))
+
+    def test_arquivar_e_restaurar_preserva_as_entradas(self):
+        self.assertEqual(archive.arquivar_logs(archive.data_limite(), lote=2), {self.dia: 5})
+        self.assertEqual(list(AuditLog.objects.values_list('id', flat=True)), [self.recente])
+        self.assertEqual(archive.carregar_indice()[self.dia.isoformat()], {
+            'primeiro': self.antigos[0], 'ultimo': self.antigos[-1], 'linhas': 5,
+        })
+
+        self.assertEqual(archive.restaurar_particao(self.dia, lote=2), 5)
+        restaurados = list(AuditLog.objects.filter(pk__in=self.antigos).order_by('id').values_list(*CAMPOS))
+        self.assertEqual(restaurados, self.originais)
+        self.assertFalse(archive.caminho_particao(self.dia).exists())
+        self.assertEqual(archive.carregar_indice(), {})
+
+    def test_nova_execucao_depois_de_interrupcao(self):
+        interrupcoes = (
+            # Partição gravada, índice não atualizado
+            mock.patch.object(archive, '_salvar_indice', side_effect=OSError('disco cheio')),
+            # Partição e índice gravados, DELETE não executado
+            mock.patch.object(QuerySet, 'delete', side_effect=OSError('banco travado')),
+        )
+        for interrupcao in interrupcoes:
+            with self.subTest(interrupcao=interrupcao.attribute):
+                with interrupcao, self.assertRaises(OSError):
+                    archive.arquivar_logs(archive.data_limite())
+                self.assertEqual(AuditLog.objects.filter(pk__in=self.antigos).count(), 5)
+
+                self.assertEqual(archive.arquivar_logs(archive.data_limite()), {self.dia: 5})
+                self.assertEqual(sorted(registro['id'] for registro in self._particao()), self.antigos)
+                self.assertEqual(archive.carregar_indice()[self.dia.isoformat()]['linhas'], 5)
+                self.assertFalse(AuditLog.objects.filter(pk__in=self.antigos).exists())
+
+                archive.restaurar_particao(self.dia)
+                restaurados = list(AuditLog.objects.filter(pk__in=self.antigos).order_by('id').values_list(*CAMPOS))
+                self.assertEqual(restaurados, self.originais)
+
+    def test_dry_run_nao_altera_nada(self):
+        saida = io.StringIO()
+        call_command('archive_audit_logs', '--dry-run', stdout=saida)
+        self.assertIn('5 entrada(s)', saida.getvalue())
+        self.assertEqual(os.listdir(self.pasta), [])
+        self.assertEqual(AuditLog.objects.count(), 6)
+        self.assertEqual(list(AuditLog.objects.filter(pk__in=self.antigos).order_by('id').values_list(*CAMPOS)),
+                         self.originais)
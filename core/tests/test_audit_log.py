@@ -0,0 +1,77 @@
+from django.db import router, transaction
+from django.test import TestCase, override_settings
+
+from core.middleware import AuditLogMiddleware
+from core.models import AuditLog
+from core.utils import audit_log_buffer, registrar_log
+
+
+def _registrar(quantidade, prefixo='entrada'):
+    for i in range(quantidade):
+        registrar_log(action="READ", model="Event", object_id=i, description=f"{prefixo} {i}")
+
+
+class RegistrarLogTests(TestCase):
+    """registrar_log espera o commit e agrupa as entradas do escopo."""
+
+    # Com AUDIT_DB_SEPARATE=1 as entradas vão para o banco 'audit'
+    databases = '__all__'
+
+    def test_espera_o_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            _registrar(1)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(AuditLog.objects.exists())
+        callbacks[0]()
+        self.assertEqual(AuditLog.objects.get().description, "entrada 0")
+
+    def test_transacao_desfeita_descarta_entrada(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    _registrar(1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_buffer_grava_ao_final_do_escopo(self):
+        with audit_log_buffer():
+            with self.captureOnCommitCallbacks(execute=True):
+                _registrar(5)
+            self.assertFalse(AuditLog.objects.exists())
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+    def test_sem_buffer_grava_cada_entrada(self):
+        with self.assertNumQueries(2, using=router.db_for_write(AuditLog)):
+            with self.captureOnCommitCallbacks(execute=True):
+                _registrar(2)
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+    @override_settings(AUDIT_LOG_BUFFER_SIZE=2)
+    def test_buffer_cheio_grava_antes_do_fim(self):
+        with audit_log_buffer():
+            with self.captureOnCommitCallbacks(execute=True):
+                _registrar(5)
+            self.assertEqual(AuditLog.objects.count(), 4)
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+    def test_middleware_um_insert_por_requisicao(self):
+        def view(request):
+            # Em produção cada commit da view executa o on_commit na hora
+            with self.captureOnCommitCallbacks(execute=True):
+                _registrar(3, prefixo='requisição')
+            return 'resposta'
+
+        with self.assertNumQueries(1, using=router.db_for_write(AuditLog)):
+            self.assertEqual(AuditLogMiddleware(view)(None), 'resposta')
+        self.assertEqual(AuditLog.objects.filter(description__startswith='requisição').count(), 3)
+
+    @override_settings(AUDIT_LOG_SYNC=True)
+    def test_modo_sincrono_grava_na_hora(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with audit_log_buffer():
+                _registrar(2)
+                self.assertEqual(AuditLog.objects.count(), 2)
+        self.assertEqual(callbacks, [])
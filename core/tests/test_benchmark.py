@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from django.test import TestCase
+
+from core import benchmark
+
+ORCAMENTO = Path(benchmark.__file__).resolve().parent / 'benchmark_budget.json'
+
+
+class OrcamentoTests(TestCase):
+    """
+    As rotas de core/urls.py respeitam os limites de queries e bytes de
+    core/benchmark_budget.json. A latência depende da máquina e fica só para
+    o comando benchmark.
+    """
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dados = benchmark.semear(users=60, events=15, registrations_per_event=10)
+
+    def test_rotas_dentro_do_orcamento(self):
+        resultados = benchmark.rodar(self.dados, repeat=2)
+        self.assertEqual({nome: m['skipped'] for nome, m in resultados.items() if 'skipped' in m}, {})
+        # Toda repetição percorre o caminho de sucesso (ver `preparar` em ROTAS)
+        falhas = {nome: m['status'] for nome, m in resultados.items() if m['status'] >= 400}
+        self.assertEqual(falhas, {})
+        violacoes = benchmark.verificar_orcamento(
+            resultados, benchmark.carregar_orcamento(ORCAMENTO), metricas=('queries', 'bytes'),
+        )
+        self.assertEqual(violacoes, [])
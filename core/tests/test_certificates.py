@@ -0,0 +1,63 @@
+import csv
+import io
+import tempfile
+import zipfile
+from datetime import date, time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from core.certificates import zip_certificados
+from core.models import Event, User
+
+
+def _pdf_falso(dados):
+    if dados['username'] == 'sem_pdf':
+        raise RuntimeError("fonte ausente")
+    return b'%PDF-1.4 ' + dados['username'].encode()
+
+
+@mock.patch('core.pdf.gerar_certificado_pdf', _pdf_falso)
+class CertificadosEmLoteTests(TestCase):
+    """O ZIP do lote traz os PDFs gerados e um relatorio.csv com cada participante."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        cls.event = Event.objects.create(
+            title='Oficina de Lote', event_type='workshop',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Auditório',
+            max_participants=10, description='Teste de certificados', organizer=organizador,
+        )
+        cls.event.participants.add(*[
+            User.objects.create_user(username, f'{username}@sgea.com', 'x')
+            for username in ('ana', 'bruno', 'sem_pdf')
+        ])
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        cache = override_settings(CERTIFICATE_CACHE_DIR=pasta.name)
+        cache.enable()
+        self.addCleanup(cache.disable)
+
+    def test_relatorio_por_participante(self):
+        concluido = []
+        conteudo = b''.join(zip_certificados(self.event, workers=1, ao_concluir=lambda *c: concluido.append(c)))
+
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as zf:
+            nomes = zf.namelist()
+            relatorio = list(csv.DictReader(io.StringIO(zf.read('relatorio.csv').decode('utf-8'))))
+            self.assertEqual(zf.read('certificado_ana_oficina-de-lote.pdf'), b'%PDF-1.4 ana')
+
+        self.assertEqual(nomes[-1], 'relatorio.csv')
+        self.assertEqual(len(nomes), 3)
+        linhas = {linha['usuario']: linha for linha in relatorio}
+        self.assertEqual(set(linhas), {'ana', 'bruno', 'sem_pdf'})
+        self.assertEqual(linhas['bruno']['status'], 'ok')
+        self.assertEqual(linhas['bruno']['arquivo'], 'certificado_bruno_oficina-de-lote.pdf')
+        self.assertEqual(linhas['sem_pdf']['status'], 'erro')
+        self.assertEqual(linhas['sem_pdf']['arquivo'], '')
+        self.assertIn('fonte ausente', linhas['sem_pdf']['erro'])
+        self.assertEqual(concluido, [(2, 1)])
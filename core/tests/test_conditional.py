@@ -0,0 +1,54 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Event
+
+User = get_user_model()
+
+
+class EtagUsuarioTests(TestCase):
+    """Editar nome ou e-mail de quem aparece no evento invalida o ETag dele."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = User.objects.create_user(username='org_etag', password='Senha@123', role='organizer')
+        cls.event = Event.objects.create(
+            title='Semana de Química', description='Palestras', event_type='lecture',
+            start_date=date.today() + timedelta(days=10), end_date=date.today() + timedelta(days=10),
+            start_time=time(9), end_time=time(11), location='Bloco A', max_participants=10,
+            organizer=cls.organizador,
+        )
+        cls.participante = User.objects.create_user(username='aluno_etag', password='Senha@123', role='student')
+        cls.event.participants.add(cls.participante)
+
+    def setUp(self):
+        self.client.force_login(self.organizador)
+        self.url = reverse('core:event_detail', args=[self.event.id])
+        # A primeira resposta grava o cookie do CSRF, que entra no ETag
+        self.client.get(self.url)
+        self.etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag).status_code, 304)
+
+    def _renderiza_de_novo(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_participante_muda_nome(self):
+        self.participante.first_name = 'Marina'
+        self.participante.save()
+        self.assertContains(self._renderiza_de_novo(), 'Marina')
+
+    def test_organizador_muda_email(self):
+        organizador = User.objects.get(pk=self.organizador.pk)
+        organizador.email = 'novo_org@sgea.com'
+        organizador.save(update_fields=['email'])
+        self._renderiza_de_novo()
+
+    def test_campo_nao_exibido_mantem_etag(self):
+        self.participante.phone = '11999990000'
+        self.participante.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag).status_code, 304)
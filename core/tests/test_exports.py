@@ -0,0 +1,103 @@
+import csv
+import io
+import zipfile
+from datetime import date, time
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import exports
+from core.models import Event, Registration, User
+from core.utils import zip_stream
+
+PLANILHA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+class ExportacaoTests(TestCase):
+    """Planilhas de inscritos em CSV e XLSX, geradas em fluxo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        cls.event = Event.objects.create(
+            title='Congresso de Dados', event_type='seminar',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 2),
+            start_time=time(9), end_time=time(18), location='Auditório',
+            max_participants=10, description='Teste de exportação', organizer=cls.organizador,
+        )
+        cls.participantes = [
+            User.objects.create_user('ana', 'ana@sgea.com', 'x', first_name='Ana', last_name='Lima', phone='11999990000'),
+            User.objects.create_user('formula', 'formula@sgea.com', 'x', first_name='=HYPERLINK("http://x")'),
+            User.objects.create_user('menos', 'menos@sgea.com', 'x', first_name='-2+3', last_name=''),
+        ]
+        cls.event.participants.add(*cls.participantes)
+
+    def setUp(self):
+        self.client.force_login(self.organizador)
+
+    def _baixar(self, formato):
+        response = self.client.get(
+            reverse('core:exportar_participantes_evento', args=[self.event.id]), {'formato': formato},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], exports.FORMATOS[formato])
+        return b''.join(response.streaming_content)
+
+    def _inscricao(self, username):
+        inscrito = Registration.objects.get(event=self.event, user__username=username).registered_at
+        return timezone.localtime(inscrito).strftime('%d/%m/%Y %H:%M')
+
+    def test_csv(self):
+        conteudo = self._baixar('csv')
+        self.assertTrue(conteudo.startswith(b'\xef\xbb\xbf'))
+        linhas = list(csv.reader(io.StringIO(conteudo.decode('utf-8-sig'))))
+        self.assertEqual(linhas[0], exports.COLUNAS_PARTICIPANTE)
+        por_usuario = {linha[1]: linha for linha in linhas[1:]}
+        self.assertEqual(
+            por_usuario['ana'],
+            ['Ana Lima', 'ana', 'ana@sgea.com', '11999990000', 'Aluno', self._inscricao('ana')],
+        )
+        # Células que a planilha executaria como fórmula
+        self.assertEqual(por_usuario['formula'][0], '\'=HYPERLINK("http://x")')
+        self.assertEqual(por_usuario['menos'][0], "'-2+3")
+
+    def test_xlsx(self):
+        # Pedaços pequenos: a planilha sai em vários membros comprimidos em fluxo
+        with mock.patch.object(exports, 'TAMANHO_PEDACO', 1):
+            conteudo = self._baixar('xlsx')
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(set(zf.namelist()), {
+                '[Content_Types].xml', '_rels/.rels', 'xl/_rels/workbook.xml.rels',
+                'xl/workbook.xml', 'xl/worksheets/sheet1.xml',
+            })
+            planilha = ElementTree.fromstring(zf.read('xl/worksheets/sheet1.xml'))
+            aba = ElementTree.fromstring(zf.read('xl/workbook.xml')).find(f'{PLANILHA}sheets/{PLANILHA}sheet')
+
+        self.assertEqual(aba.get('name'), 'Inscrições')
+        linhas = [
+            [celula.findtext(f'{PLANILHA}is/{PLANILHA}t') for celula in linha]
+            for linha in planilha.iter(f'{PLANILHA}row')
+        ]
+        self.assertEqual(linhas[0], exports.COLUNAS_PARTICIPANTE)
+        self.assertEqual(len(linhas), 1 + len(self.participantes))
+        por_usuario = {linha[1]: linha for linha in linhas[1:]}
+        self.assertEqual(por_usuario['formula'][0], '=HYPERLINK("http://x")')
+        self.assertEqual(por_usuario['ana'][5], self._inscricao('ana'))
+
+
+class ZipStreamTests(SimpleTestCase):
+    """zip_stream aceita conteúdo em bytes ou em pedaços."""
+
+    def test_membros_em_pedacos(self):
+        pedacos = [f'linha {i}\n'.encode() for i in range(500)]
+        saida = list(zip_stream([('a.txt', b'inteiro'), ('b.txt', iter(pedacos))]))
+        self.assertGreater(len(saida), 2)
+        with zipfile.ZipFile(io.BytesIO(b''.join(saida))) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read('a.txt'), b'inteiro')
+            self.assertEqual(zf.read('b.txt'), b''.join(pedacos))
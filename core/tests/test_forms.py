@@ -0,0 +1,63 @@
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.forms import AuditLogFilterForm, EventFilterForm
+from core.models import AuditLog, Event, User
+
+
+class FiltrosInvalidosTests(TestCase):
+    """Filtros inválidos não viram uma listagem sem filtro."""
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        cls.event = Event.objects.create(
+            title='Hackathon de Verão', event_type='workshop',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 2),
+            start_time=time(9), end_time=time(18), location='Bloco B',
+            max_participants=10, description='Teste de filtros', organizer=cls.organizador,
+        )
+        AuditLog.objects.create(user=cls.organizador, action='CREATE', model='Event', object_id=cls.event.id,
+                                description='Evento criado: Hackathon de Verão')
+
+    def test_formularios_invalidos_nao_retornam_nada(self):
+        for form, queryset in (
+            (AuditLogFilterForm({'user': 'ninguem'}), AuditLog.objects.all()),
+            (AuditLogFilterForm({'date_from': '31/31/2030'}), AuditLog.objects.all()),
+            (EventFilterForm({'date_from': '2030-02-01', 'date_to': '2030-01-01'}), Event.objects.all()),
+            (EventFilterForm({'event_type': 'show'}), Event.objects.all()),
+        ):
+            with self.subTest(dados=form.data):
+                self.assertFalse(form.is_valid())
+                self.assertFalse(form.filtrar(queryset).exists())
+
+    def test_visualizador_de_logs_com_usuario_inexistente(self):
+        self.client.force_login(self.organizador)
+        response = self.client.get(reverse('core:audit_logs'), {'user': 'ninguem'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Usuário não encontrado.')
+        self.assertContains(response, 'Nenhum log encontrado.')
+        self.assertNotContains(
+            self.client.get(reverse('core:audit_logs'), {'user': 'organizador'}),
+            'Nenhum log encontrado.',
+        )
+
+    def test_lista_de_eventos_com_data_invalida(self):
+        for params in ({'date_from': 'ontem'}, {'date_from': 'ontem', 'q': 'hackathon'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('core:events'), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotContains(response, 'Hackathon de Verão')
+                self.assertContains(response, 'Informe uma data válida.')
+
+    def test_api_responde_400(self):
+        client = APIClient()
+        client.force_authenticate(self.organizador)
+        response = client.get(reverse('core:api_events_list'), {'date_from': 'ontem'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_from', response.json())
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+from datetime import date, time
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core import images
+from core.models import Event, User
+
+
+def _jpeg(largura, altura, cor='navy'):
+    saida = io.BytesIO()
+    Image.new('RGB', (largura, altura), cor).save(saida, 'JPEG')
+    return saida.getvalue()
+
+
+class ProcessarBannerTests(TestCase):
+    """As variantes só são gravadas se o banner não foi trocado durante o processamento."""
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.media = pasta.name
+        midia = override_settings(MEDIA_ROOT=self.media, BANNER_PROCESSING_ASYNC=False)
+        midia.enable()
+        self.addCleanup(midia.disable)
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        # O processamento agendado pelo save (on_commit) não roda no TestCase
+        self.event = Event.objects.create(
+            title='Feira de Ciências', event_type='workshop',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Pátio',
+            max_participants=10, description='Teste de banner', organizer=organizador,
+            banner=SimpleUploadedFile('feira.jpg', _jpeg(1600, 900)),
+        )
+
+    def _variantes_no_disco(self):
+        pasta = os.path.join(self.media, images.PASTA)
+        return sorted(os.listdir(pasta)) if os.path.isdir(pasta) else []
+
+    def test_grava_variantes_do_banner_atual(self):
+        self.assertTrue(images.processar_banner(self.event.pk))
+        self.event.refresh_from_db()
+        variantes = self.event.banner_variants
+        self.assertEqual(variantes['source'], self.event.banner.name)
+        self.assertEqual((variantes['thumb']['width'], variantes['medium']['width']), (400, 1200))
+        self.assertEqual(len(self._variantes_no_disco()), 4)
+
+    def test_banner_trocado_durante_o_processamento(self):
+        gerar_original = images.gerar_variantes
+        storage = Event._meta.get_field('banner').storage
+        novo = []
+
+        def trocar_no_meio(banner):
+            # Outra requisição troca o banner enquanto as variantes são geradas
+            novo.append(storage.save('event_banners/novo.jpg', ContentFile(_jpeg(800, 600, 'red'))))
+            Event.objects.filter(pk=self.event.pk).update(banner=novo[0])
+            return gerar_original(banner)
+
+        with mock.patch.object(images, 'gerar_variantes', trocar_no_meio):
+            self.assertFalse(images.processar_banner(self.event.pk))
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.banner.name, novo[0])
+        self.assertEqual(self.event.banner_variants, {})
+        # As variantes do banner antigo não ficam órfãs no disco
+        self.assertEqual(self._variantes_no_disco(), [])
+        # A execução agendada pela troca processa o banner novo
+        self.assertTrue(images.processar_banner(self.event.pk))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.banner_variants['source'], self.event.banner.name)
@@ -0,0 +1,83 @@
+from datetime import date, time
+
+from django.test import TestCase
+
+from core.imports import DESCONHECIDO, REPETIDO, importar_participantes
+from core.models import Event, User
+from core.registrations import INSCRITO, JA_INSCRITO, LOTADO, ORGANIZADOR, inscrever_em_lote, reservar_vaga
+
+
+class ImportacaoParticipantesTests(TestCase):
+    """Importação em lote: estado de cada linha e vagas na ordem do arquivo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        cls.event = Event.objects.create(
+            title='Minicurso de Python', event_type='minicourse',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Laboratório',
+            max_participants=4, description='Teste de importação', organizer=cls.organizador,
+        )
+        cls.usuarios = {
+            username: User.objects.create_user(username, f'{username}@sgea.com', 'x')
+            for username in ('ja', 'novo1', 'novo2', 'novo3', 'novo4', 'novo5')
+        }
+        reservar_vaga(cls.event, cls.usuarios['ja'])
+
+    def test_estado_de_cada_linha(self):
+        csv = (
+            "username;nome\n"
+            "organizador;Organizador\n"
+            "ja;Já inscrito\n"
+            "NOVO1@sgea.com;Por e-mail\n"
+            "novo2;\n"
+            "ninguem;Não existe\n"
+            "novo1;Repetido\n"
+            "novo3;\n"
+            "novo4;\n"
+            "novo5;\n"
+        )
+        relatorio = importar_participantes(self.event, csv.encode('utf-8'), por=self.organizador)
+
+        self.assertEqual(
+            [(linha['linha'], linha['valor'], linha['status']) for linha in relatorio['linhas']],
+            [
+                (2, 'organizador', ORGANIZADOR),
+                (3, 'ja', JA_INSCRITO),
+                (4, 'NOVO1@sgea.com', INSCRITO),
+                (5, 'novo2', INSCRITO),
+                (6, 'ninguem', DESCONHECIDO),
+                (7, 'novo1', REPETIDO),
+                (8, 'novo3', INSCRITO),
+                (9, 'novo4', LOTADO),
+                (10, 'novo5', LOTADO),
+            ],
+        )
+        self.assertEqual(relatorio['resumo'], {
+            ORGANIZADOR: 1, JA_INSCRITO: 1, INSCRITO: 3, DESCONHECIDO: 1, REPETIDO: 1, LOTADO: 2,
+        })
+
+        self.event.refresh_from_db()
+        inscritos = set(self.event.participants.values_list('username', flat=True))
+        # As vagas ficam com as primeiras linhas do arquivo
+        self.assertEqual(inscritos, {'ja', 'novo1', 'novo2', 'novo3'})
+        self.assertEqual(self.event.participants_count, self.event.participants.count())
+
+    def test_lote_respeita_vagas_e_contador(self):
+        ids = [self.usuarios[username].pk for username in ('novo5', 'novo4', 'ja', 'novo3', 'novo2')]
+        resultados = inscrever_em_lote(self.event, ids)
+        self.assertEqual(list(resultados.items()), [
+            (self.usuarios['novo5'].pk, INSCRITO),
+            (self.usuarios['novo4'].pk, INSCRITO),
+            (self.usuarios['ja'].pk, JA_INSCRITO),
+            (self.usuarios['novo3'].pk, INSCRITO),
+            (self.usuarios['novo2'].pk, LOTADO),
+        ])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 4)
+        self.assertEqual(self.event.participants.count(), 4)
+        # Evento cheio: um novo lote não inscreve ninguém nem mexe no contador
+        self.assertEqual(inscrever_em_lote(self.event, [self.usuarios['novo2'].pk]), {self.usuarios['novo2'].pk: LOTADO})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, self.event.participants.count())
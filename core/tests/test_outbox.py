@@ -0,0 +1,62 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import EmailOutbox
+from core.outbox import RESERVA, enfileirar_email, enviar_lote, reservar_lote
+
+
+def _vencer(*itens):
+    EmailOutbox.objects.filter(pk__in=[item.pk for item in itens]).update(next_attempt_at=timezone.now())
+
+
+@override_settings(EMAIL_OUTBOX_BACKOFF=60, EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_PER_MINUTE=0)
+class OutboxTests(TestCase):
+    """Espera exponencial, reserva do lote e limite por minuto da fila de e-mails."""
+
+    def test_falha_reagenda_com_espera_exponencial(self):
+        item = enfileirar_email("Assunto", ['aluno@sgea.com'], body="Olá")
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=SMTPException("servidor recusou")):
+            for tentativa, espera in ((1, 60), (2, 120)):
+                antes = timezone.now()
+                self.assertEqual(enviar_lote(), {'sent': 0, 'retry': 1, 'failed': 0, 'limited': False})
+                item.refresh_from_db()
+                self.assertEqual(item.attempts, tentativa)
+                self.assertEqual(item.status, EmailOutbox.PENDING)
+                self.assertIn('servidor recusou', item.last_error)
+                self.assertGreaterEqual(item.next_attempt_at, antes + timedelta(seconds=espera))
+                self.assertLess(item.next_attempt_at, antes + timedelta(seconds=espera + 5))
+                # Antes da hora a mensagem não é tentada de novo
+                self.assertEqual(enviar_lote()['retry'], 0)
+                _vencer(item)
+
+            self.assertEqual(enviar_lote()['failed'], 1)
+        item.refresh_from_db()
+        self.assertEqual(item.status, EmailOutbox.FAILED)
+        self.assertEqual(enviar_lote()['sent'], 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_lote_reservado_nao_e_pego_de_novo(self):
+        itens = [enfileirar_email(f"Mensagem {i}", ['aluno@sgea.com'], body="Olá") for i in range(3)]
+        reservados = reservar_lote(2)
+        self.assertEqual([item.pk for item in reservados], [itens[0].pk, itens[1].pk])
+        self.assertGreater(reservados[0].next_attempt_at, timezone.now() + RESERVA - timedelta(seconds=5))
+        # Outro worker só encontra o que sobrou
+        self.assertEqual([item.pk for item in reservar_lote(10)], [itens[2].pk])
+        self.assertEqual(reservar_lote(10), [])
+        # Reserva vencida (worker morreu): as mensagens voltam para a fila
+        _vencer(*reservados)
+        self.assertEqual(len(reservar_lote(10)), 2)
+
+    def test_limite_por_minuto(self):
+        for i in range(3):
+            enfileirar_email(f"Mensagem {i}", ['aluno@sgea.com'], body="Olá")
+        self.assertEqual(enviar_lote(por_minuto=2), {'sent': 2, 'retry': 0, 'failed': 0, 'limited': False})
+        self.assertEqual(enviar_lote(por_minuto=2), {'sent': 0, 'retry': 0, 'failed': 0, 'limited': True})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.PENDING).count(), 1)
@@ -0,0 +1,67 @@
+import re
+from datetime import date, time, timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import benchmark
+from core.forms import EventFilterForm
+from core.models import Event
+from core.pagination import EventKeysetPagination
+
+User = get_user_model()
+
+_INDICE_DE_EVENTO = re.compile(r'USING (COVERING )?INDEX event_')
+_LEITURA_COMPLETA = re.compile(r'SCAN core_event\b|USE TEMP B-TREE')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Planos verificados só no SQLite')
+class PlanoFiltrosTests(TestCase):
+    """Cada filtro de benchmark.FILTROS_INDEXADOS usa um índice de Event."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dados = benchmark.semear(users=60, events=15, registrations_per_event=10)
+
+    def test_filtros_usam_indice(self):
+        limite = EventKeysetPagination.page_size + 1
+        for nome, params in benchmark.FILTROS_INDEXADOS.items():
+            with self.subTest(filtro=nome):
+                filtros = EventFilterForm(params(self.dados))
+                self.assertTrue(filtros.is_valid(), filtros.errors)
+                plano = filtros.filtrar(Event.objects.order_by('start_date', 'id'))[:limite].explain()
+                self.assertRegex(plano, _INDICE_DE_EVENTO)
+                self.assertNotRegex(plano, _LEITURA_COMPLETA)
+
+
+class BuscaEventosPassadosTests(TestCase):
+    """A busca textual não herda o corte em hoje da listagem."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizador = User.objects.create_user(username='org_busca', password='Senha@123', role='organizer')
+        cls.passado = Event.objects.create(
+            title='Colóquio de Astronomia', description='Edição anterior', event_type='lecture',
+            start_date=date.today() - timedelta(days=30), end_date=date.today() - timedelta(days=30),
+            start_time=time(10), end_time=time(12), location='Auditório', max_participants=10,
+            organizer=organizador,
+        )
+        cls.usuario = User.objects.create_user(username='aluno_busca', password='Senha@123', role='student')
+
+    def test_api_de_busca_inclui_passados(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        response = client.get(reverse('core:api_events_search'), {'q': 'astronomia'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['id'] for e in response.json()['results']], [self.passado.id])
+
+    def test_listagem_sem_busca_mantem_corte(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        response = client.get(reverse('core:api_events_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.passado.id, [e['id'] for e in response.json()['results']])
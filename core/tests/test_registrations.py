@@ -0,0 +1,82 @@
+import threading
+from collections import Counter
+from datetime import date, time
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+
+from core.models import Event, Registration, User
+from core.registrations import INSCRITO, JA_INSCRITO, LOTADO, reservar_vaga
+
+
+class ReservaConcorrenteTests(TransactionTestCase):
+    """Centenas de inscrições simultâneas num evento nunca passam das vagas."""
+    databases = '__all__'
+    VAGAS = 20
+    TENTATIVAS = 200
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            self.skipTest("Precisa de um SQLite em arquivo (DATABASES['default']['TEST']['NAME']).")
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        self.event = Event.objects.create(
+            title='Evento concorrido', event_type='lecture',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Auditório',
+            max_participants=self.VAGAS, description='Teste de concorrência', organizer=organizador,
+        )
+        self.usuarios = User.objects.bulk_create([
+            User(username=f'participante_{i}', email=f'participante_{i}@sgea.com')
+            for i in range(self.TENTATIVAS)
+        ])
+
+    def test_vagas_nunca_excedidas(self):
+        barreira = threading.Barrier(self.TENTATIVAS)
+        resultados, erros = [], []
+
+        def inscrever(user):
+            try:
+                barreira.wait()
+                resultados.append(reservar_vaga(self.event, user))
+            except Exception as e:
+                erros.append(e)
+            finally:
+                # Cada thread tem a sua conexão
+                connections.close_all()
+
+        threads = [threading.Thread(target=inscrever, args=(user,)) for user in self.usuarios]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        self.event.refresh_from_db()
+        contagem = Counter(resultados)
+        self.assertEqual(self.event.participants_count, self.VAGAS)
+        self.assertEqual(Registration.objects.filter(event=self.event).count(), self.VAGAS)
+        self.assertEqual(contagem[INSCRITO], self.VAGAS)
+        self.assertEqual(contagem[LOTADO], self.TENTATIVAS - self.VAGAS)
+
+
+class ReservaVagaTests(TestCase):
+    """Resultados de reservar_vaga com o evento cheio."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        cls.event = Event.objects.create(
+            title='Evento de uma vaga', event_type='lecture',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Auditório',
+            max_participants=1, description='Teste de resultado', organizer=organizador,
+        )
+        cls.inscrito = User.objects.create_user('inscrito', 'inscrito@sgea.com', 'x')
+        cls.outro = User.objects.create_user('outro', 'outro@sgea.com', 'x')
+
+    def test_inscrito_em_evento_cheio_recebe_ja_inscrito(self):
+        self.assertEqual(reservar_vaga(self.event, self.inscrito), INSCRITO)
+        self.assertEqual(reservar_vaga(self.event, self.inscrito), JA_INSCRITO)
+        self.assertEqual(reservar_vaga(self.event, self.outro), LOTADO)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 1)
@@ -0,0 +1,56 @@
+from datetime import date, datetime, time, timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Event, Registration, User
+from core.reminders import enviar_lembretes
+
+AGORA = timezone.make_aware(datetime(2030, 1, 1, 8, 0))
+JANELA = timedelta(hours=24)
+
+
+class LembretesTests(TestCase):
+    """Uma execução interrompida retoma de onde parou, sem repetir envios."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        cls.event = Event.objects.create(
+            title='Palestra de Abertura', event_type='lecture',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Auditório',
+            max_participants=10, description='Teste de lembretes', organizer=organizador,
+        )
+        cls.event.participants.add(*[
+            User.objects.create_user(f'aluno{i}', f'aluno{i}@sgea.com', 'x', first_name=f'Aluno {i}')
+            for i in range(5)
+        ])
+
+    def test_retoma_depois_de_falha(self):
+        envio_original = EmailBackend.send_messages
+        chamadas = []
+
+        def segundo_pedaco_falha(backend, mensagens):
+            chamadas.append(len(mensagens))
+            if len(chamadas) == 2:
+                raise SMTPException("conexão perdida")
+            return envio_original(backend, mensagens)
+
+        with mock.patch.object(EmailBackend, 'send_messages', segundo_pedaco_falha):
+            with self.assertRaises(SMTPException):
+                enviar_lembretes(JANELA, tamanho_lote=2, agora=AGORA)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Registration.objects.filter(event=self.event, reminder_sent_at__isnull=False).count(), 2)
+
+        self.assertEqual(enviar_lembretes(JANELA, tamanho_lote=2, agora=AGORA), {self.event: 3})
+        self.assertEqual(enviar_lembretes(JANELA, tamanho_lote=2, agora=AGORA), {self.event: 0})
+
+        destinatarios = [mensagem.to[0] for mensagem in mail.outbox]
+        self.assertEqual(sorted(destinatarios), [f'aluno{i}@sgea.com' for i in range(5)])
+        self.assertIn('Aluno 3', mail.outbox[3].body)
+        self.assertFalse(Registration.objects.filter(event=self.event, reminder_sent_at__isnull=True).exists())
@@ -0,0 +1,87 @@
+from datetime import date, time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import SimpleTestCase, TestCase
+
+from core import routers
+from core.models import AuditLog, Event, Registration, User
+from core.routers import AUDIT_DB, AuditRouter
+
+SEPARADO = AUDIT_DB in settings.DATABASES
+
+
+class AuditRouterTests(SimpleTestCase):
+    """Destino de cada modelo com e sem o alias 'audit'."""
+
+    def setUp(self):
+        self.router = AuditRouter()
+
+    def test_com_banco_de_auditoria(self):
+        with mock.patch.object(routers, '_separado', return_value=True):
+            for model in (AuditLog, AuditLog(action='READ')):
+                self.assertEqual(self.router.db_for_read(model), AUDIT_DB)
+                self.assertEqual(self.router.db_for_write(model), AUDIT_DB)
+            for model in (Event, User, Registration):
+                self.assertEqual(self.router.db_for_read(model), DEFAULT_DB_ALIAS)
+                self.assertEqual(self.router.db_for_write(model), DEFAULT_DB_ALIAS)
+
+            self.assertTrue(self.router.allow_migrate(AUDIT_DB, 'core', 'auditlog'))
+            self.assertFalse(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'core', 'auditlog'))
+            self.assertFalse(self.router.allow_migrate(AUDIT_DB, 'core', 'event'))
+            self.assertFalse(self.router.allow_migrate(AUDIT_DB, 'auth', 'permission'))
+            self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'core', 'event'))
+
+    def test_sem_banco_de_auditoria_nao_interfere(self):
+        with mock.patch.object(routers, '_separado', return_value=False):
+            for model in (AuditLog, Event, User):
+                self.assertIsNone(self.router.db_for_read(model))
+                self.assertIsNone(self.router.db_for_write(model))
+            self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'core', 'auditlog'))
+            self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'core', 'event'))
+        self.assertEqual(routers._separado(), SEPARADO)
+
+    def test_relacao_entre_bancos(self):
+        log, usuario = AuditLog(action='READ'), User(username='x')
+        self.assertTrue(self.router.allow_relation(log, usuario))
+        self.assertTrue(self.router.allow_relation(usuario, log))
+        self.assertIsNone(self.router.allow_relation(usuario, Event()))
+
+
+@skipUnless(SEPARADO, "só com AUDIT_DB_SEPARATE=1")
+class BancoDeAuditoriaTests(TestCase):
+    """Com AUDIT_DB_SEPARATE=1 o AuditLog vive só no banco 'audit'."""
+
+    # O executor junta os bancos de todas as classes, mesmo as puladas
+    databases = {DEFAULT_DB_ALIAS, AUDIT_DB} if SEPARADO else {DEFAULT_DB_ALIAS}
+
+    def test_migracoes_em_cada_banco(self):
+        principal = connections[DEFAULT_DB_ALIAS].introspection.table_names()
+        auditoria = connections[AUDIT_DB].introspection.table_names()
+        self.assertIn('core_event', principal)
+        self.assertNotIn('core_auditlog', principal)
+        self.assertIn('core_auditlog', auditoria)
+        self.assertNotIn('core_event', auditoria)
+
+    def test_leitura_e_gravacao(self):
+        organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+        event = Event.objects.create(
+            title='Semana Acadêmica', event_type='seminar',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 5),
+            start_time=time(8), end_time=time(18), location='Campus',
+            max_participants=100, description='Teste de roteamento', organizer=organizador,
+        )
+        log = AuditLog.objects.create(
+            user=organizador, action='CREATE', model='Event', object_id=event.id, description='Evento criado',
+        )
+        self.assertEqual(router.db_for_write(AuditLog), AUDIT_DB)
+        self.assertEqual((event._state.db, organizador._state.db, log._state.db),
+                         (DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS, AUDIT_DB))
+        self.assertTrue(AuditLog.objects.using(AUDIT_DB).filter(pk=log.pk).exists())
+
+        # A FK sem constraint é lida no banco principal
+        lido = AuditLog.objects.get(pk=log.pk)
+        self.assertEqual(lido._state.db, AUDIT_DB)
+        self.assertEqual(lido.user, organizador)
+        self.assertEqual(lido.user._state.db, DEFAULT_DB_ALIAS)
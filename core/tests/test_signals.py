@@ -0,0 +1,115 @@
+import math
+from datetime import date, time
+
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Event, Registration, User
+from core.registrations import INSCRITO, reservar_vaga
+
+# Queries de um add/remove/clear em participants, qualquer que seja o
+# tamanho do lote: a leitura dos ids existentes, o INSERT/DELETE e, no
+# sync_registration, a leitura dos nomes e o UPDATE do contador.
+QUERIES_POR_OPERACAO = 4
+
+
+def _lotes_extras_de_insert(quantidade):
+    # O próprio Django divide o INSERT da tabela de inscrições em lotes
+    # (limite de parâmetros do SQLite); isso não é do
+    # signal, que continua com o mesmo número de queries
+    campos = [field for field in Registration._meta.concrete_fields if not field.primary_key]
+    por_lote = connection.ops.bulk_batch_size(campos, [None] * quantidade)
+    return math.ceil(quantidade / por_lote) - 1
+
+
+class SyncRegistrationQueriesTests(TestCase):
+    """O m2m_changed de participants não faz uma query por participante."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+
+    def _evento(self, titulo='Evento'):
+        return Event.objects.create(
+            title=titulo, event_type='lecture',
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            start_time=time(10), end_time=time(12), location='Auditório',
+            max_participants=1000, description='Teste de queries', organizer=self.organizador,
+        )
+
+    def _usuarios(self, quantidade):
+        return User.objects.bulk_create([
+            User(username=f'lote{quantidade}_{i}', email=f'lote{quantidade}_{i}@sgea.com')
+            for i in range(quantidade)
+        ])
+
+    def test_add_remove_clear_com_queries_constantes(self):
+        for quantidade in (5, 300):
+            with self.subTest(quantidade=quantidade):
+                event = self._evento(f'Evento {quantidade}')
+                usuarios = self._usuarios(quantidade)
+                extras = _lotes_extras_de_insert(quantidade)
+
+                with self.assertNumQueries(QUERIES_POR_OPERACAO + extras):
+                    event.participants.add(*usuarios)
+                event.refresh_from_db()
+                self.assertEqual(event.participants_count, quantidade)
+
+                with self.assertNumQueries(QUERIES_POR_OPERACAO):
+                    event.participants.remove(*usuarios)
+                event.refresh_from_db()
+                self.assertEqual(event.participants_count, 0)
+
+                event.participants.add(*usuarios)
+                with self.assertNumQueries(QUERIES_POR_OPERACAO):
+                    event.participants.clear()
+                event.refresh_from_db()
+                self.assertEqual(event.participants_count, 0)
+
+    def test_lado_do_usuario_com_queries_constantes(self):
+        usuario = self._usuarios(1)[0]
+        for quantidade in (5, 300):
+            with self.subTest(quantidade=quantidade):
+                eventos = [self._evento(f'Evento {quantidade}-{i}') for i in range(quantidade)]
+
+                with self.assertNumQueries(QUERIES_POR_OPERACAO + _lotes_extras_de_insert(quantidade)):
+                    usuario.events_participated.add(*eventos)
+                with self.assertNumQueries(QUERIES_POR_OPERACAO):
+                    usuario.events_participated.remove(*eventos)
+                self.assertEqual(
+                    Event.objects.filter(pk__in=[e.pk for e in eventos], participants_count=0).count(), quantidade,
+                )
+
+
+class ExclusaoUsuarioTests(TestCase):
+    """Excluir um usuário devolve as vagas dos eventos em que estava inscrito."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = User.objects.create_user('organizador', 'organizador@sgea.com', 'x', role='organizer')
+
+    def test_exclusao_devolve_vagas(self):
+        eventos = [
+            Event.objects.create(
+                title=f'Evento de uma vaga {i}', event_type='lecture',
+                start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+                start_time=time(10), end_time=time(12), location='Auditório',
+                max_participants=1, description='Teste de exclusão', organizer=self.organizador,
+            )
+            for i in range(2)
+        ]
+        usuario = User.objects.create_user('saindo', 'saindo@sgea.com', 'x')
+        for event in eventos:
+            self.assertEqual(reservar_vaga(event, usuario), INSCRITO)
+        versao = Event.objects.get(pk=eventos[0].pk).updated_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario.delete()
+
+        for event in eventos:
+            event.refresh_from_db()
+            self.assertEqual(event.participants_count, 0)
+            self.assertEqual(event.participants.count(), 0)
+        self.assertGreater(eventos[0].updated_at, versao)
+        novo = User.objects.create_user('chegando', 'chegando@sgea.com', 'x')
+        self.assertEqual(reservar_vaga(eventos[0], novo), INSCRITO)
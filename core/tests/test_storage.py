@@ -0,0 +1,54 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core.storage import ContentHashStorage, hash_conteudo
+
+
+class ContentHashStorageTests(SimpleTestCase):
+    """Um único arquivo por conteúdo, mesmo com uploads simultâneos."""
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.storage = ContentHashStorage(location=pasta.name)
+        self.conteudo = b'\xff\xd8banner' * 1000
+        self.esperado = f'event_banners/{hash_conteudo(ContentFile(self.conteudo))}.jpg'
+
+    def _arquivos(self):
+        return sorted(os.listdir(self.storage.path('event_banners')))
+
+    def test_mesmo_conteudo_mesmo_arquivo(self):
+        self.assertEqual(self.storage.save('event_banners/a.JPG', ContentFile(self.conteudo)), self.esperado)
+        self.assertEqual(self.storage.save('event_banners/b.jpg', ContentFile(self.conteudo)), self.esperado)
+        self.assertEqual(self._arquivos(), [os.path.basename(self.esperado)])
+
+    def test_arquivo_criado_depois_da_checagem(self):
+        self.storage.save('event_banners/a.jpg', ContentFile(self.conteudo))
+        exists = self.storage.exists
+        # O outro upload cria o arquivo entre o exists() e o open(O_EXCL)
+        with mock.patch.object(self.storage, 'exists', side_effect=[False, True]):
+            nome = self.storage.save('event_banners/b.jpg', ContentFile(self.conteudo))
+        self.assertEqual(nome, self.esperado)
+        self.assertTrue(exists(nome))
+        self.assertEqual(self._arquivos(), [os.path.basename(self.esperado)])
+
+    def test_uploads_simultaneos(self):
+        barreira = threading.Barrier(8)
+        nomes = []
+
+        def enviar():
+            barreira.wait()
+            nomes.append(self.storage.save('event_banners/x.jpg', ContentFile(self.conteudo)))
+
+        threads = [threading.Thread(target=enviar) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(nomes, [self.esperado] * 8)
+        self.assertEqual(self._arquivos(), [os.path.basename(self.esperado)])
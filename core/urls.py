@@ -36,9 +36,11 @@ urlpatterns = [
 
     # API Eventos
     path('api/events/', views.EventListAPI.as_view(), name='api_events_list'),
+    path('api/events/search/', views.EventSearchAPI.as_view(), name='api_events_search'),
     path('api/events/create/', views.EventCreateAPI.as_view(), name='api_event_create'),
     path('api/events/<int:event_id>/register/', views.EventRegisterAPI.as_view(), name='api_event_register'),
     path('api/events/<int:event_id>/cancel/', EventCancelAPI.as_view(), name='api_event_cancel'),
+    path('api/events/<int:event_id>/import/', views.EventImportAPI.as_view(), name='api_event_import'),
     path('api/my-events/', MyEventsAPI.as_view(), name='api_my_events'),
 
     # Pré-visualização de email
@@ -48,6 +50,9 @@ urlpatterns = [
     path("logs/", audit_logs, name="audit_logs"),
     path('activate/<uidb64>/', views.activate_user, name='activate_user'),
     path('event/<int:event_id>/certificado/<int:user_id>/', views.emitir_certificado, name='emitir_certificado'),
+    path('event/<int:event_id>/certificados/', views.emitir_certificados_evento, name='emitir_certificados_evento'),
+    path('event/<int:event_id>/participantes/exportar/', views.exportar_participantes_evento, name='exportar_participantes_evento'),
+    path('inscricoes/exportar/', views.exportar_inscricoes, name='exportar_inscricoes'),
     
 ]
 
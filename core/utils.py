@@ -1,7 +1,19 @@
-from django.core.mail import EmailMultiAlternatives
+import io
+import os
+import re
+import zipfile
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.conf import settings
 from .models import AuditLog
+from .outbox import enfileirar_email
+
+# Registros de auditoria já confirmados aguardando o bulk_create do escopo atual
+_audit = Local()
 
 def send_welcome_email(user, link):
     subject = "🎉 Bem-vindo(a) ao SGEA!"
@@ -15,15 +27,157 @@ def send_welcome_email(user, link):
     }
 
     html_content = render_to_string('core/welcome_email.html', context)
-    msg = EmailMultiAlternatives(subject, '', from_email, to)
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    # Só grava na fila; o envio é feito pelo comando send_outbox
+    enfileirar_email(subject, to, html_body=html_content, from_email=from_email)
 
-def registrar_log(user=None, action="", model="", object_id="", description=""):
-    AuditLog.objects.create(
+def registrar_log(user=None, action="", model="", object_id="", description="", changes=None):
+    """
+    Registra uma entrada de auditoria. `changes` é o diff {campo: [antes,
+    depois]} de um UPDATE.
+
+    Dentro de `audit_log_buffer()` (toda requisição, via AuditLogMiddleware)
+    a entrada só entra no buffer depois que a transação em curso for
+    confirmada e é gravada junto com as demais num único bulk_create. Entradas
+    de transações desfeitas são descartadas. Com AUDIT_LOG_SYNC=True o INSERT
+    é imediato, como antes.
+    """
+    entry = AuditLog(
         user=user,
         action=action,
         model=model,
         object_id=str(object_id),
-        description=description
+        description=description,
+        changes=changes,
     )
+    if getattr(settings, 'AUDIT_LOG_SYNC', False):
+        entry.save()
+        return
+    # Fora de um bloco atomic o on_commit executa na hora.
+    transaction.on_commit(lambda: _enfileirar_log(entry))
+
+
+def _enfileirar_log(entry):
+    entries = getattr(_audit, 'entries', None)
+    if entries is None:
+        entry.save()
+        return
+    entries.append(entry)
+    if len(entries) >= getattr(settings, 'AUDIT_LOG_BUFFER_SIZE', 100):
+        flush_audit_logs()
+
+
+def flush_audit_logs():
+    """Grava o buffer do escopo atual com um único INSERT."""
+    entries = getattr(_audit, 'entries', None)
+    if not entries:
+        return
+    _audit.entries = []
+    AuditLog.objects.bulk_create(entries)
+
+
+@contextmanager
+def audit_log_buffer():
+    """Agrupa os registros de auditoria do bloco e os grava ao final."""
+    if getattr(_audit, 'entries', None) is not None:
+        # Escopo aninhado: quem abriu o primeiro faz o flush
+        yield
+        return
+    _audit.entries = []
+    try:
+        yield
+    finally:
+        try:
+            flush_audit_logs()
+        finally:
+            _audit.entries = None
+
+
+class _SaidaZip(io.RawIOBase):
+    """Destino não posicionável para o ZipFile: acumula bytes até serem lidos."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def retirar(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+
+def zip_stream(arquivos, compression=zipfile.ZIP_DEFLATED):
+    """
+    Gera um ZIP em pedaços a partir de pares (nome, conteúdo), sem montar o
+    arquivo inteiro em memória. Próprio para StreamingHttpResponse.
+
+    O conteúdo pode ser bytes ou um iterável de pedaços de bytes; neste caso
+    o arquivo é comprimido e enviado à medida que os pedaços chegam.
+    """
+    saida = _SaidaZip()
+    with zipfile.ZipFile(saida, 'w', compression=compression) as zf:
+        for nome, conteudo in arquivos:
+            if isinstance(conteudo, (bytes, str)):
+                zf.writestr(nome, conteudo)
+            else:
+                with zf.open(nome, 'w') as destino:
+                    for pedaco in conteudo:
+                        destino.write(pedaco)
+                        yield saida.retirar()
+            yield saida.retirar()
+    yield saida.retirar()
+
+
+# ---------------- Download de arquivos ----------------
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def servir_arquivo(request, caminho, content_type, filename):
+    """
+    Entrega um arquivo do disco com ETag e suporte a If-None-Match (304) e a
+    um único intervalo em Range (206), para downloads retomáveis.
+    """
+    stat = os.stat(caminho)
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime_ns):x}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    tamanho = stat.st_size
+    intervalo = request.headers.get('Range')
+    if intervalo and request.headers.get('If-Range', etag) == etag:
+        match = _RANGE.match(intervalo.strip())
+        inicio = fim = None
+        if match and any(match.groups()):
+            if match.group(1):
+                inicio = int(match.group(1))
+                fim = min(int(match.group(2)), tamanho - 1) if match.group(2) else tamanho - 1
+            else:
+                # bytes=-N: os últimos N bytes
+                inicio, fim = max(tamanho - int(match.group(2)), 0), tamanho - 1
+        if inicio is None or inicio > fim or inicio >= tamanho:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{tamanho}'
+            return response
+        with open(caminho, 'rb') as f:
+            f.seek(inicio)
+            response = HttpResponse(f.read(fim - inicio + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+    else:
+        response = FileResponse(open(caminho, 'rb'), content_type=content_type)
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
@@ -1,50 +1,62 @@
-from datetime import datetime, date
-import os
-
-from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout, authenticate, get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.decorators import method_decorator
+from django.utils.text import slugify
 
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
-
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.units import cm
-from reportlab.platypus import Paragraph, Frame
-from reportlab.lib.styles import getSampleStyleSheet
+from rest_framework.utils.urls import replace_query_param
 
 from .models import Event, Certificate, AuditLog, Registration
-from .forms import RegisterForm, EditProfileForm, LoginForm, EventForm
-from .serializers import EventSerializer, EventCreateSerializer
-from .utils import registrar_log, send_welcome_email
+from .forms import RegisterForm, EditProfileForm, LoginForm, EventForm, EventFilterForm, AuditLogFilterForm
+from .serializers import EventSerializer, EventCreateSerializer, event_fields_context
+from .pagination import EventKeysetPagination, pagina_por_timestamp
+from .conditional import evento_condicional, lista_condicional
+from .cache import cards_eventos, pagina_publica
+from .certificates import nome_arquivo, obter_pdf, zip_certificados
+from .exports import COLUNAS_EVENTO, COLUNAS_PARTICIPANTE, FORMATOS, exportar, linhas_evento, linhas_organizador
+from .utils import registrar_log, send_welcome_email, servir_arquivo
+from .search import buscar_eventos
+from .imports import importar_participantes
+from .archive import buscar_arquivados
+from .registrations import reservar_vaga, cancelar_inscricao, LOTADO, JA_INSCRITO
 
 User = get_user_model()
 
 # ---------------- HOME ----------------
+@pagina_publica
 def home_view(request):
     events = Event.objects.all()
-    return render(request, 'core/home.html', {'events': events})
+    # Cards vêm do cache (core/cache.py); só os eventos alterados são renderizados
+    return render(request, 'core/home.html', {'cards': cards_eventos(events)})
 
 # ---------------- EVENT LIST (WEB) --------------
+@lista_condicional
+@pagina_publica
 def event_list(request):
-    events = Event.objects.all()
-    return render(request, 'core/event_list.html', {'events': events})
+    q = request.GET.get('q', '').strip()
+    filtros = EventFilterForm(request.GET)
+    # A busca textual procura também nos eventos passados
+    events = filtros.filtrar(Event.objects.order_by('start_date', 'id'), somente_futuros=not q)
+    if q:
+        # Resultados da busca textual, do mais relevante para o menos
+        events = buscar_eventos(q, events, limite=50)
+    return render(request, 'core/event_list.html', {'cards': cards_eventos(events), 'q': q, 'filtros': filtros})
 
 # ---------------- EVENT DETAIL -----------------
 @login_required
+@evento_condicional
 def event_detail(request, event_id):
     event = get_object_or_404(Event, id=event_id)
-    registered = request.user in event.participants.all()
+    registered = event.participants.filter(id=request.user.id).exists()
     is_organizer = request.user.role == 'organizer'
     participants = event.participants.all()
 
@@ -54,31 +66,16 @@ def event_detail(request, event_id):
             if request.user == event.organizer:
                 messages.error(request, "Os organizadores não podem se inscrever em eventos.")
 
-            elif event.participants.count() >= event.max_participants:
+            elif reservar_vaga(event, request.user) == LOTADO:
                 messages.error(request, "Limite de vagas atingido.")
             else:
-                event.participants.add(request.user)
                 messages.success(request, 'Inscrição realizada!')
-                registrar_log(
-                    user=request.user,
-                    action="CREATE",
-                    model="Registration",
-                    object_id=f"{request.user.id}-{event.id}",
-                    description=f"Usuário {request.user.username} inscrito no evento {event.title}"
-                )
                 return redirect('core:event_detail', event_id=event.id)
 
         # ---------------- CANCELAMENTO ----------------
         elif 'unsubscribe' in request.POST and registered:
-            event.participants.remove(request.user)
+            cancelar_inscricao(event, request.user)
             messages.success(request, 'Inscrição cancelada!')
-            registrar_log(
-                user=request.user,
-                action="DELETE",
-                model="Registration",
-                object_id=f"{request.user.id}-{event.id}",
-                description=f"Usuário {request.user.username} cancelou a inscrição no evento {event.title}"
-            )
             return redirect('core:event_detail', event_id=event.id)
 
     return render(request, 'core/event_detail.html', {
@@ -86,7 +83,7 @@ def event_detail(request, event_id):
         'registered': registered,
         'is_organizer': is_organizer,
         'participants': participants,
-        'participants_count': participants.count(),
+        'participants_count': event.participants_count,
     })
 
 
@@ -248,56 +245,83 @@ def emitir_certificado(request, event_id, user_id):
 
     certificado, created = Certificate.objects.get_or_create(user=user, event=event)
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificado_{user.username}_{event.title}.pdf"'
+    # O PDF é gerado uma vez e reaproveitado até o nome ou o evento mudarem
+    caminho, dados = obter_pdf(certificado)
+    return servir_arquivo(request, caminho, 'application/pdf', nome_arquivo(dados))
 
-    c = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
 
-    c.setFillColorRGB(1, 1, 1)
-    c.rect(0, 0, width, height, fill=1)
+@login_required
+def emitir_certificados_evento(request, event_id):
+    """Todos os certificados do evento num ZIP gerado em fluxo."""
+    event = get_object_or_404(Event, id=event_id)
 
-    c.setStrokeColor(colors.HexColor("#43054E"))
-    c.setLineWidth(4)
-    c.rect(2*cm, 2*cm, width - 4*cm, height - 4*cm, stroke=1, fill=0)
+    if request.user != event.organizer:
+        return HttpResponse("Sem permissão.", status=403)
 
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'image', 'sgea.jpg')
-    if os.path.exists(logo_path):
-        c.drawImage(logo_path, x=width/2 - 2*cm, y=height - 6*cm,
-                    width=4*cm, height=4*cm, preserveAspectRatio=True, mask='auto')
+    # Só registra depois do último PDF; download interrompido não vira log
+    def registrar_lote(emitidos, falhas):
+        registrar_log(
+            user=request.user,
+            action="CREATE",
+            model="Certificate",
+            object_id=f"ALL-{event.id}",
+            description=f"Certificados do evento {event.title} emitidos em lote: {emitidos} ok, {falhas} com erro"
+        )
 
-   
-    c.setFont("Helvetica-Bold", 26)
-    c.setFillColor(colors.HexColor("#43054E"))
-    c.drawCentredString(width/2, height - 7.5*cm, "Certificado de Participação")
+    response = StreamingHttpResponse(zip_certificados(event, ao_concluir=registrar_lote), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="certificados_{slugify(event.title)}.zip"'
+    return response
 
-    styles = getSampleStyleSheet()
-    style = styles['Normal']
-    style.alignment = 1
-    style.fontName = 'Helvetica'
-    style.fontSize = 14
-    style.leading = 22
 
-    text = f"""
-    Certificamos que <b>{user.first_name or user.username}</b> participou do evento
-    <b>{event.title}</b>, realizado de {event.start_date.strftime('%d/%m/%Y')} 
-    a {event.end_date.strftime('%d/%m/%Y')}, no local {event.location}.
-    """
-    para = Paragraph(text, style)
-    frame = Frame(3*cm, height/2 - 3*cm, width - 6*cm, 6*cm, showBoundary=0)
+# ---------------- EXPORTAÇÃO DE INSCRITOS -----------------
+def _planilha_response(request, linhas, cabecalho, nome):
+    """StreamingHttpResponse em ?formato=csv (padrão) ou xlsx."""
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS:
+        return HttpResponse("Formato inválido.", status=400)
+    response = StreamingHttpResponse(exportar(formato, cabecalho, linhas), content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nome}.{formato}"'
+    return response
+
+
+@login_required
+def exportar_participantes_evento(request, event_id):
+    """Participantes do evento em planilha, gerada em fluxo."""
+    event = get_object_or_404(Event, id=event_id)
+
+    if request.user != event.organizer:
+        return HttpResponse("Sem permissão.", status=403)
 
-    frame.addFromList([para], c)
+    response = _planilha_response(
+        request, linhas_evento(event), COLUNAS_PARTICIPANTE, f"participantes_{slugify(event.title)}"
+    )
+    registrar_log(
+        user=request.user,
+        action="READ",
+        model="Registration",
+        object_id=f"ALL-{event.id}",
+        description=f"Participantes do evento {event.title} exportados"
+    )
+    return response
 
-    data_hora = datetime.now().strftime('%d/%m/%Y, às %H:%M')
-    c.setFont("Helvetica-Oblique", 12)
-    c.drawCentredString(width/2, 4*cm, f"Emitido em {data_hora}")
 
-    c.setFont("Helvetica", 12)
-    c.drawString(width - 9*cm, 3.1*cm, "________________________")
-    c.drawString(width - 8.8*cm, 2.5*cm, "Assinatura do Organizador")
+@login_required
+def exportar_inscricoes(request):
+    """Inscrições de todos os eventos do organizador em planilha."""
+    if request.user.role != 'organizer':
+        return HttpResponse("Sem permissão.", status=403)
 
-    c.showPage()
-    c.save()
+    response = _planilha_response(
+        request, linhas_organizador(request.user), COLUNAS_EVENTO + COLUNAS_PARTICIPANTE,
+        f"inscricoes_{slugify(request.user.username)}"
+    )
+    registrar_log(
+        user=request.user,
+        action="READ",
+        model="Registration",
+        object_id="ALL",
+        description=f"Inscrições dos eventos de {request.user.username} exportadas"
+    )
     return response
 
 
@@ -309,11 +333,41 @@ class EventRegisterThrottle(UserRateThrottle):
     scope = 'events_register'
 
 # ---------------- API -----------------
+@method_decorator(lista_condicional, name='get')
 class EventListAPI(generics.ListAPIView):
-    queryset = Event.objects.all().order_by("start_date")
+    """
+    Lista eventos em páginas por chave (start_date, id).
+
+    `?fields=id,title,start_date` limita os campos e
+    `?expand=organizer,participants` aninha as relações; a consulta carrega
+    só o que foi pedido. Filtros: ver core.forms.EventFilterForm (por
+    padrão, só eventos a partir de hoje). Responde 304 se a listagem não
+    mudou desde o ETag/Last-Modified do cliente (core/conditional.py).
+    """
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
     throttle_classes = [EventListThrottle]
+    pagination_class = EventKeysetPagination
+    somente_futuros = True
+
+    def get_fields_context(self):
+        if not hasattr(self, '_fields_context'):
+            self._fields_context = event_fields_context(self.request)
+        return self._fields_context
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), **self.get_fields_context()}
+
+    def get_queryset(self):
+        # ?date_from, ?date_to, ?event_type, ?organizer, ?has_seats e ?past;
+        # sem datas, só eventos a partir de hoje
+        filtros = EventFilterForm(self.request.query_params)
+        if not filtros.is_valid():
+            raise ValidationError(filtros.errors)
+        return EventSerializer.prepare_queryset(
+            filtros.filtrar(Event.objects.order_by('start_date', 'id'), self.somente_futuros),
+            **self.get_fields_context()
+        )
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -326,6 +380,49 @@ class EventListAPI(generics.ListAPIView):
         )
         return response
 
+class EventSearchAPI(EventListAPI):
+    """
+    Busca textual em título, descrição e local: `?q=`, com os resultados do
+    mais para o menos relevante. Aceita `?fields=`/`?expand=` como a
+    listagem e pagina com `?limit=` (máx. 100) e `?offset=`. Procura em
+    todos os eventos, passados inclusive; os filtros da listagem continuam
+    valendo quando informados.
+    """
+    pagination_class = None
+    somente_futuros = False
+    default_limit = 20
+    max_limit = 100
+
+    def _inteiro(self, nome, padrao, minimo, maximo):
+        try:
+            valor = int(self.request.query_params.get(nome, padrao))
+        except ValueError:
+            raise ValidationError({nome: "Informe um número inteiro."})
+        return max(minimo, min(valor, maximo))
+
+    def list(self, request, *args, **kwargs):
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            raise ValidationError({'q': "Informe o termo de busca."})
+        limit = self._inteiro('limit', self.default_limit, 1, self.max_limit)
+        offset = self._inteiro('offset', 0, 0, 10 ** 6)
+
+        # Um resultado a mais só para saber se há próxima página
+        events = list(buscar_eventos(q, self.get_queryset(), limite=limit + 1, offset=offset))
+        next_url = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_url = replace_query_param(request.build_absolute_uri(), 'offset', offset + limit)
+
+        registrar_log(
+            user=request.user,
+            action="READ",
+            model="Event",
+            object_id="SEARCH",
+            description=f"Usuário {request.user.username} buscou eventos via API: {q[:100]}"
+        )
+        return Response({'next': next_url, 'results': self.get_serializer(events, many=True).data})
+
 class EventCreateAPI(generics.CreateAPIView):
     serializer_class = EventCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -359,24 +456,13 @@ class EventRegisterAPI(APIView):
             return Response({"error": "Os organizadores não podem se inscrever em eventos."}, status=403)
 
 
-        # Verifica se já está inscrito
-        if event.participants.filter(id=user.id).exists():
+        # Reserva a vaga com um UPDATE condicional no contador do evento
+        resultado = reservar_vaga(event, user)
+        if resultado == JA_INSCRITO:
             return Response({"error": "Usuário já inscrito."}, status=400)
-
-        # Verifica limite de vagas
-        if event.participants.count() >= event.max_participants:
+        if resultado == LOTADO:
             return Response({"error": "Limite de vagas atingido."}, status=400)
 
-        # Realiza a inscrição
-        event.participants.add(user)
-        registrar_log(
-            user=user,
-            action="CREATE",
-            model="Registration",
-            object_id=f"{user.id}-{event.id}",
-            description=f"Usuário {user.username} inscrito no evento {event.title}"
-        )
-
         return Response({"success": "Inscrição realizada!"})
 
 
@@ -391,26 +477,50 @@ class EventCancelAPI(APIView):
         except Event.DoesNotExist:
             return Response({"error": "Evento não encontrado."}, status=404)
 
-        if request.user not in event.participants.all():
+        if not cancelar_inscricao(event, request.user):
             return Response({"error": "Você não está inscrito."}, status=400)
 
-        event.participants.remove(request.user)
-        registrar_log(
-            user=request.user,
-            action="DELETE",
-            model="Registration",
-            object_id=f"{request.user.id}-{event.id}",
-            description=f"Usuário {request.user.username} cancelou inscrição no evento {event.title}"
-        )
         return Response({"success": "Inscrição removida!"})
 
 
+class EventImportAPI(APIView):
+    """
+    Importa participantes de um CSV (campo `file`) de usernames ou e-mails.
+    As vagas são conferidas uma vez para o arquivo todo; a resposta traz o
+    resumo e o resultado de cada linha: registered, already_registered,
+    duplicate, unknown, full ou organizer.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, event_id):
+        try:
+            event = Event.objects.get(id=event_id)
+        except Event.DoesNotExist:
+            return Response({"error": "Evento não encontrado."}, status=404)
+
+        if request.user.pk != event.organizer_id:
+            return Response({"error": "Apenas o organizador do evento pode importar participantes."}, status=403)
+
+        arquivo = request.FILES.get('file')
+        if arquivo is None:
+            return Response({"error": "Envie o CSV no campo 'file'."}, status=400)
+        try:
+            relatorio = importar_participantes(event, arquivo.read(), por=request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response(relatorio)
+
+
+@method_decorator(lista_condicional, name='get')
 class MyEventsAPI(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        events = Event.objects.filter(participants=request.user)
-        return Response(EventSerializer(events, many=True).data)
+        context = event_fields_context(request)
+        events = EventSerializer.prepare_queryset(
+            Event.objects.filter(participants=request.user).order_by('start_date', 'id'), **context
+        )
+        return Response(EventSerializer(events, many=True, context={'request': request, **context}).data)
 
 
 # ---------------- EMAIL PREVIEW -----------------
@@ -426,10 +536,44 @@ def audit_logs(request):
     if request.user.role != "organizer":
         messages.error(request, "Apenas organizadores podem visualizar os logs.")
         return redirect("core:home")
-    all_logs = AuditLog.objects.all().order_by('-timestamp')
-    paginator = Paginator(all_logs, 20)  # limite de 20 por página
-    page_number = request.GET.get('page')
-    logs = paginator.get_page(page_number)
-    return render(request, "core/audit_logs.html", {"logs": logs})
+
+    filtros = AuditLogFilterForm(request.GET)
+    # Página por chave: ?before=<id> traz as entradas mais antigas que a
+    # entrada <id> e ?after=<id> as mais novas (20 por página)
+    cursor = {
+        'antes': _inteiro_ou_none(request.GET.get('before')),
+        'depois': _inteiro_ou_none(request.GET.get('after')),
+    }
+    arquivados = filtros.is_valid() and filtros.cleaned_data['archived']
+    if arquivados:
+        logs, mais_novas, mais_antigas = buscar_arquivados(filtros.cleaned_data, **cursor)
+    else:
+        # prefetch em vez de JOIN: o AuditLog pode estar em outro banco
+        logs = filtros.filtrar(AuditLog.objects.prefetch_related('user'))
+        logs, mais_novas, mais_antigas = pagina_por_timestamp(logs, **cursor)
+    return render(request, "core/audit_logs.html", {
+        "logs": logs,
+        "filtros": filtros,
+        "arquivados": arquivados,
+        "primeira_pagina": _link_logs(request) if mais_novas else None,
+        "mais_novas": _link_logs(request, after=logs[0].id) if mais_novas and logs else None,
+        "mais_antigas": _link_logs(request, before=logs[-1].id) if mais_antigas else None,
+    })
+
+
+def _inteiro_ou_none(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _link_logs(request, **cursor):
+    # Mantém os filtros e troca só o cursor
+    params = request.GET.copy()
+    params.pop('before', None)
+    params.pop('after', None)
+    params.update(cursor)
+    return '?' + params.urlencode()
 
 
@@ -55,8 +55,51 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.AuditLogMiddleware',
 ]
 
+# ---------------- Auditoria ----------------
+# Entradas acumuladas por requisição antes de forçar um bulk_create
+AUDIT_LOG_BUFFER_SIZE = 100
+# True grava cada entrada na hora (útil em testes que consultam AuditLog
+# antes do fim da requisição)
+AUDIT_LOG_SYNC = False
+# Dias que as entradas ficam no banco antes de o comando archive_audit_logs
+# movê-las para o arquivo
+AUDIT_LOG_RETENTION_DAYS = int(os.environ.get('AUDIT_LOG_RETENTION_DAYS', 180))
+# Partições diárias (.jsonl.gz) das entradas arquivadas; ao contrário de
+# cache/, não pode ser apagada
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'archive' / 'auditoria'
+
+# ---------------- Certificados ----------------
+# Processos usados na emissão em lote (None = número de CPUs)
+CERTIFICATE_WORKERS = None
+# PDFs já gerados, um por certificado; pode ser apagado a qualquer momento
+CERTIFICATE_CACHE_DIR = BASE_DIR / 'cache' / 'certificados'
+
+# ---------------- Banners ----------------
+# False processa as variantes do banner na própria requisição (útil em testes)
+BANNER_PROCESSING_ASYNC = True
+
+# ---------------- Cache ----------------
+# Páginas públicas e cards de eventos (core/cache.py). A memória local é de
+# cada processo; com vários processos use CACHE_BACKEND=file, para que a
+# invalidação chegue a todos.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+        }[CACHE_BACKEND],
+        'LOCATION': str(BASE_DIR / 'cache' / 'django') if CACHE_BACKEND == 'file' else 'sgea',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+# Validade das páginas e cards em cache, em segundos; as alterações de
+# eventos já os invalidam antes disso
+EVENT_CACHE_TIMEOUT = 600
+
 # ---------------- URLs ----------------
 ROOT_URLCONF = 'sgea_project.urls'
 
@@ -85,9 +128,36 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # IMMEDIATE: cada transação pega o lock de escrita no início, então
+            # inscrições concorrentes esperam em fila em vez de falhar com
+            # "database is locked" ao tentar promover o lock.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'TEST': {
+            # Arquivo em vez de memória: o teste de inscrições concorrentes
+            # (core/tests) abre uma conexão por thread
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# ---------------- Banco de auditoria ----------------
+# Com AUDIT_DB_SEPARATE=1 o AuditLog vai para um SQLite próprio
+# (core/routers.py), e os INSERTs de auditoria deixam de disputar com as
+# inscrições o lock de escrita do db.sqlite3. Ao ativar:
+#   python manage.py migrate --database audit
+#   python manage.py move_audit_logs
+AUDIT_DB_SEPARATE = os.environ.get('AUDIT_DB_SEPARATE') == '1'
+if AUDIT_DB_SEPARATE:
+    DATABASES['audit'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('AUDIT_DB_NAME', BASE_DIR / 'audit.sqlite3'),
+        'TEST': {'NAME': BASE_DIR / 'test_audit.sqlite3'},
+    }
+DATABASE_ROUTERS = ['core.routers.AuditRouter']
+
 # ---------------- Auth User Model ----------------
 AUTH_USER_MODEL = 'core.User'
 
@@ -138,7 +208,9 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Para testar sem SMTP: EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'cache' / 'emails'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -146,4 +218,15 @@ EMAIL_HOST_USER = 'emailusuarioteste2025@gmail.com'
 EMAIL_HOST_PASSWORD = 'thng dvdd xgpb bpwb'  # senha de app do Gmail 
 DEFAULT_FROM_EMAIL = 'SGEA <emailusuarioteste2025@gmail.com>'
 
+# Fila de e-mails (comando send_outbox)
+EMAIL_OUTBOX_BATCH_SIZE = 50
+# O Gmail bloqueia contas que enviam rápido demais
+EMAIL_OUTBOX_PER_MINUTE = 30
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Espera antes da 2ª tentativa, em segundos; dobra a cada falha
+EMAIL_OUTBOX_BACKOFF = 60
+
+# Antecedência dos lembretes de evento (comando send_event_reminders)
+EVENT_REMINDER_WINDOW_HOURS = 24
+
 